@@ -1,11 +1,9 @@
 import streamlit as st
-from helpers.connection import get_main_db_connection, get_cache_db_connection
-from helpers.fetch.home import fetch_home_stats
+from helpers.fetch.home import fetch_home_snapshot
 from helpers.fetch.cash_yield import fetch_cash_yield_metrics  # 🔄 New helper
 
-# === Load Data ===
-with get_main_db_connection() as conn_main, get_cache_db_connection() as conn_cache:
-    stats = fetch_home_stats(conn_main, conn_cache)
+# === Load Data (shared snapshot, refreshed when new transactions land)
+stats = fetch_home_snapshot()
 
 # === Load Cash Yield (from external API)
 lifetime_yield, yield_24h = fetch_cash_yield_metrics()
@@ -5,10 +5,20 @@ import os
 
 from helpers.sync.transactions import sync_transaction_cache
 from helpers.sync.daily_stats import sync_daily_stats
+from helpers.sync.user_cohorts import sync_user_cohorts
+from helpers.sync.user_signups import sync_user_signups
 from helpers.sync.fees import sync_fee_series
-from helpers.sync.weekly_data import sync_weekly_data, sync_weekly_avg_revenue_metrics
-from helpers.upsert.weekly_stats import upsert_weekly_swap_revenue
+from helpers.sync.cash_yield import sync_cash_yield
+from helpers.sync.financials import sync_avg_revenue_metrics
+from helpers.sync.leaderboards import sync_leaderboard_snapshots
+from helpers.sync.referrals import sync_referrals
+from helpers.sync.wallet_addresses import sync_wallet_addresses
+from helpers.sync.weekly_data import sync_weekly_data, sync_weekly_avg_revenue_metrics, sync_weekly_swap_stats
 from helpers.upsert.users import upsert_users
+from helpers.upsert.indexes import ensure_indexes
+from helpers.upsert.transactions import ensure_ingested_at_column
+from helpers.upsert.user_daily_activity import seed_user_daily_activity
+from helpers.upsert.calendar import ensure_calendar
 from helpers.connection import get_main_db_connection, get_cache_db_connection
 
 # === Start log ===
@@ -24,12 +34,30 @@ for label, conn_fn in [("MAIN", get_main_db_connection), ("CACHE", get_cache_db_
     except Exception as e:
         print(f"❌ Failed to connect to {label} DB:", e)
 
+# === One-time setup: ingestion columns and rollups, dashboard indexes and calendar ===
+try:
+    with get_cache_db_connection() as conn:
+        ensure_ingested_at_column(conn)
+        seed_user_daily_activity(conn)
+        ensure_indexes(conn)
+        ensure_calendar(conn)
+except Exception as e:
+    print("❌ Error running one-time setup:", e)
+
 # === Run sync jobs ===
 for label, fn in [
+    ("wallet addresses", sync_wallet_addresses),
     ("transaction cache", sync_transaction_cache),
+    ("users table", upsert_users),
+    ("referrals", sync_referrals),
+    ("user signups", sync_user_signups),
     ("daily stats", sync_daily_stats),
+    ("user cohorts", sync_user_cohorts),
     ("fee series", sync_fee_series),
+    ("cash yield", sync_cash_yield),
+    ("avg revenue metrics", sync_avg_revenue_metrics),
     ("weekly data", sync_weekly_data),
+    ("leaderboard snapshots", sync_leaderboard_snapshots),
 ]:
     try:
         fn()
@@ -39,8 +67,7 @@ for label, fn in [
 
 # === Sync weekly swap revenue ===
 try:
-    with get_cache_db_connection() as conn:
-        upsert_weekly_swap_revenue(conn)
+    sync_weekly_swap_stats()
     print("✅ Finished syncing weekly swap revenue")
 except Exception as e:
     print("❌ Error syncing weekly swap revenue:", e)
@@ -52,11 +79,4 @@ try:
 except Exception as e:
     print("❌ Error syncing weekly avg revenue metrics:", e)
 
-# === Sync users table ===
-try:
-    upsert_users()
-    print("✅ Finished syncing users table")
-except Exception as e:
-    print("❌ Error syncing users table:", e)
-
 print("🎉 Cron sync completed at:", datetime.utcnow())
@@ -0,0 +1,19 @@
+# === cron_sync_intraday.py ===
+from datetime import datetime
+from helpers.sync.transactions import sync_transaction_cache
+from helpers.sync.intraday_stats import sync_intraday_stats
+from helpers.sync.user_signups import sync_recent_users
+
+if __name__ == "__main__":
+    print("\n🔁 Intraday sync started at:", datetime.utcnow())
+
+    for label, fn in [
+        ("transaction cache", sync_transaction_cache),
+        ("intraday stats", sync_intraday_stats),
+        ("recent users", sync_recent_users),
+    ]:
+        try:
+            fn()
+            print(f"✅ Finished syncing {label}")
+        except Exception as e:
+            print(f"❌ Error syncing {label}:", e)
@@ -1,7 +1,17 @@
 from helpers.connection import get_cache_db_connection
 import pandas as pd
 
-def fetch_daily_app_downloads():
+def fetch_daily_app_downloads(start=None, end=None):
+    query = "SELECT * FROM daily_app_downloads WHERE 1=1"
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date <= %s"
+        params.append(end)
+    query += " ORDER BY date"
+
     with get_cache_db_connection() as conn:
-        df = pd.read_sql("SELECT * FROM daily_app_downloads ORDER BY date", conn)
+        df = pd.read_sql(query, conn, params=tuple(params))
     return df
@@ -1,53 +1,79 @@
-import requests
 from typing import Tuple
+import pandas as pd
 import streamlit as st
+from helpers.connection import get_cache_db_connection
+
+
+# Yield history only moves when the sync job runs; share one read across sessions for a while
+CASH_YIELD_TTL = 300
 
-api_url = st.secrets["cash"]["yield_api_url"]
 
 def fetch_cash_yield_metrics() -> Tuple[float, float]:
     """
-    Fetches the latest cash yield metrics.
+    Cash yield metrics from the stored yield history.
+    Cached for CASH_YIELD_TTL; failures are not cached.
     Returns:
         - lifetime_yield: Total yield since inception (balance - original_balance summed across all assets).
-        - yield_24h: Delta in total yield from previous to latest timestamp across all assets.
+        - yield_24h: Change in total yield between each asset's latest history point and its
+          last point at or before 24 hours ago.
     """
     try:
-        print(f"📡 Requesting cash yield from: {api_url}")
-        response = requests.get(api_url)
-        print("➡️ Response status code:", response.status_code)
-        print("📦 Raw response text (truncated):", response.text[:500])
-
-        response.raise_for_status()
-        data = response.json()
-        print("✅ Parsed JSON keys:", list(data.keys()))
-
-        # === Lifetime Yield ===
-        fullassets = data.get("fullassets", {})
-        lifetime_yield = sum(
-            float(asset.get("balance", 0)) - float(asset.get("original_balance", 0))
-            for asset in fullassets.values()
-        )
-        print("📊 Calculated lifetime_yield:", lifetime_yield)
-
-        # === 24h Yield from assethistory ===
-        assethistory = data.get("assethistory", {})
-        print(f"🕓 Found assethistory for {len(assethistory)} assets")
-
-        yield_24h = 0.0
-        for asset_id, entries in assethistory.items():
-            if len(entries) >= 2:
-                prev = entries[-2]
-                latest = entries[-1]
-                prev_yield = float(prev[1]) - float(prev[2])  # balance - original
-                latest_yield = float(latest[1]) - float(latest[2])
-                delta = latest_yield - prev_yield
-                yield_24h += delta
-                print(f"↪️ {asset_id}: Δ={delta:.4f} ({latest_yield:.4f} - {prev_yield:.4f})")
-
-        print("📊 Calculated yield_24h:", yield_24h)
-
-        return lifetime_yield, yield_24h
-
+        return _cash_yield_metrics()
     except Exception as e:
         print(f"❌ Exception in fetch_cash_yield_metrics: {e}")
         return 0.0, 0.0
+
+
+@st.cache_data(ttl=CASH_YIELD_TTL, show_spinner=False)
+def _cash_yield_metrics() -> Tuple[float, float]:
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(SUM(balance - original_balance), 0) FROM cash_yield_assets")
+            lifetime_yield = float(cur.fetchone()[0])
+
+            # Per asset: latest point vs the last point at or before now - 24h (primary key lookups);
+            # assets with no point that old yet are left out rather than counted since inception
+            cur.execute("""
+                SELECT COALESCE(SUM(latest.yield - past.yield), 0)
+                FROM cash_yield_assets a
+                CROSS JOIN LATERAL (
+                    SELECT balance - original_balance AS yield
+                    FROM cash_yield_history h
+                    WHERE h.asset_id = a.asset_id
+                    ORDER BY ts DESC LIMIT 1
+                ) latest
+                CROSS JOIN LATERAL (
+                    SELECT balance - original_balance AS yield
+                    FROM cash_yield_history h
+                    WHERE h.asset_id = a.asset_id AND h.ts <= now() - INTERVAL '24 hours'
+                    ORDER BY ts DESC LIMIT 1
+                ) past
+            """)
+            yield_24h = float(cur.fetchone()[0])
+
+    return lifetime_yield, yield_24h
+
+
+def fetch_cash_yield_series(start=None, end=None) -> pd.DataFrame:
+    """
+    Yield (balance - original_balance) per asset at each stored point in [start, end).
+    """
+    query = """
+        SELECT asset_id, ts, balance, original_balance, balance - original_balance AS yield
+        FROM cash_yield_history
+        WHERE 1=1
+    """
+    params = []
+    if start:
+        query += " AND ts >= %s"
+        params.append(start)
+    if end:
+        query += " AND ts < %s"
+        params.append(end)
+    query += " ORDER BY ts ASC"
+
+    with get_cache_db_connection() as conn:
+        df = pd.read_sql(query, conn, params=tuple(params))
+
+    df["ts"] = pd.to_datetime(df["ts"])
+    return df
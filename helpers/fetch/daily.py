@@ -22,7 +22,10 @@ def fetch_daily_stats(start=None, end=None):
                     SUM(cash_volume)::DOUBLE PRECISION AS cash_volume,
                     SUM(cash_revenue)::DOUBLE PRECISION AS cash_revenue,
                     SUM(revenue)::DOUBLE PRECISION AS revenue,
-                    MAX(active_users) AS active_users
+                    COALESCE(
+                        (SELECT r.dau_all_types FROM rolling_active_users r WHERE r.date = daily_stats.date),
+                        MAX(active_users)
+                    ) AS active_users
                 FROM daily_stats
                 WHERE 1=1
             """
@@ -65,12 +68,22 @@ def fetch_daily_user_stats(start=None, end=None):
             df["date"] = pd.to_datetime(df["date"])
             return df
         
-def fetch_total_balances():
+def fetch_total_balances(start=None, end=None):
+    query = """
+        SELECT date, total_balance_usd
+        FROM daily_total_balances
+        WHERE 1=1
+    """
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date <= %s"
+        params.append(end)
+    query += " ORDER BY date ASC"
+
     with get_cache_db_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("""
-                SELECT date, total_balance_usd
-                FROM daily_total_balances
-                ORDER BY date ASC
-            """)
+            cur.execute(query, tuple(params))
             return cur.fetchall()
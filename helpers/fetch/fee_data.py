@@ -1,48 +1,45 @@
-from datetime import datetime
+from datetime import date, datetime
 import pandas as pd
-from collections import defaultdict
 from helpers.connection import get_cache_db_connection
 from helpers.utils.constants import CHAIN_ID_MAP
 from helpers.utils.safe_math import safe_float
 
 
-def fetch_fee_series(start: datetime = None, end: datetime = None):
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def fetch_fee_series(start: date = None, end: date = None, types=("SWAP",)):
     """
-    Loads fee data from transactions_cache for SWAPs with SUCCESS status,
-    optionally within a date range, and returns a flattened DataFrame
-    grouped by date and chain.
+    Loads daily fees per chain from the fee_rollup table (SWAPs by default),
+    optionally for days in [start, end), and returns a flattened DataFrame
+    with date, chain and value columns.
     """
-    with get_cache_db_connection() as conn:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT DATE(created_at) AS date, fee_usd, from_chain
-                FROM transactions_cache
-                WHERE type = 'SWAP' AND status = 'SUCCESS'
-            """
-            params = []
+    sql = """
+        SELECT date, chain, SUM(fee_usd)
+        FROM fee_rollup
+        WHERE type = ANY(%s)
+    """
+    params = [list(types)]
 
-            if start:
-                sql += " AND created_at >= %s"
-                params.append(start)
-            if end:
-                sql += " AND created_at < %s"
-                params.append(end)
+    if start:
+        sql += " AND date >= %s"
+        params.append(_as_date(start))
+    if end:
+        sql += " AND date < %s"
+        params.append(_as_date(end))
+    sql += " GROUP BY date, chain ORDER BY date"
 
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cursor:
             cursor.execute(sql, tuple(params))
             rows = cursor.fetchall()
 
-    fee_data = defaultdict(lambda: defaultdict(float))
-    for created_date, fee, from_chain_id in rows:
-        chain = CHAIN_ID_MAP.get(from_chain_id, str(from_chain_id))
-        fee_data[created_date][chain] += safe_float(fee)
-
-    flattened = []
-    for dt, chain_map in fee_data.items():
-        for chain, value in chain_map.items():
-            flattened.append({
-                "date": dt,
-                "chain": chain,
-                "value": round(value, 6)
-            })
-
-    return pd.DataFrame(flattened)
\ No newline at end of file
+    return pd.DataFrame([
+        {
+            "date": dt,
+            "chain": CHAIN_ID_MAP.get(chain, str(chain)),
+            "value": round(safe_float(value), 6)
+        }
+        for dt, chain, value in rows
+    ], columns=["date", "chain", "value"])
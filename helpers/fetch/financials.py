@@ -1,77 +1,172 @@
 from datetime import date, timedelta
 import pandas as pd
-from helpers.connection import get_main_db_connection, get_cache_db_connection
-from helpers.upsert.avg_revenue import upsert_avg_revenue_metrics
+from helpers.connection import get_cache_db_connection
 from helpers.fetch.fee_data import fetch_fee_series
+from helpers.upsert.revenue_cube import GRAINS
+from helpers.fetch.user_sketches import fetch_daily_sketches, fetch_distinct_users
+from helpers.utils import hll
+from helpers.utils.calendar import week_start
 
 
-def fetch_avg_revenue_metrics(days: int = 30, snapshot_date: date = None) -> dict:
-    snapshot_date = snapshot_date or date.today()
-    start_date = snapshot_date - timedelta(days=days)
+def fetch_revenue_cube(grain: str = "day", dimensions=(), start: date = None, end: date = None,
+                       chains=None, types=("SWAP",)) -> pd.DataFrame:
+    """
+    Revenue cube lookup: fees and transaction counts per period at `grain` ('day', 'week', 'month'),
+    broken down by any of `dimensions` ('chain', 'type'), for periods starting in [start, end]
+    and optionally filtered to some chains / types.
+    Returns columns: period_start, *dimensions, fee_usd, tx_count.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain: {grain}")
+    dimensions = list(dimensions)
+    unknown = set(dimensions) - {"chain", "type"}
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {unknown}")
 
-    # === Load fee data from transactions_cache ===
-    fee_df = fetch_fee_series()
-    fee_df = fee_df[fee_df["date"] >= start_date]
-    total_fees = fee_df["value"].sum()
+    group_cols = ", ".join(["period_start", *dimensions])
+    query = f"""
+        SELECT {group_cols}, SUM(fee_usd) AS fee_usd, SUM(tx_count) AS tx_count
+        FROM revenue_cube
+        WHERE grain = %s
+    """
+    params = [grain]
+    if start:
+        query += " AND period_start >= %s"
+        params.append(start)
+    if end:
+        query += " AND period_start <= %s"
+        params.append(end)
+    if chains:
+        query += " AND chain = ANY(%s)"
+        params.append(list(chains))
+    if types:
+        query += " AND type = ANY(%s)"
+        params.append(list(types))
+    query += f" GROUP BY {group_cols} ORDER BY {group_cols}"
+
+    with get_cache_db_connection() as conn:
+        df = pd.read_sql(query, conn, params=tuple(params))
+
+    df["period_start"] = pd.to_datetime(df["period_start"])
+    df["fee_usd"] = df["fee_usd"].astype(float)
+    return df
+
+
+def fetch_revenue_cube_bounds(grain: str = "day"):
+    """
+    (first, last) period_start stored at `grain`, or (None, None) when the cube is empty.
+    """
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT MIN(period_start), MAX(period_start) FROM revenue_cube WHERE grain = %s", (grain,))
+            return cur.fetchone()
+
+
+def fetch_avg_revenue_metrics_history(start_date: date, end_date: date, days: int = 30) -> pd.DataFrame:
+    """
+    Rolling monetization metrics for every date in [start_date, end_date], each over
+    the window [date - days, date]:
+      - fees and signups from window functions over fee_rollup / user_signups_daily
+      - distinct swappers from a sliding merge of the daily SWAP user sketches
+    """
+    lookback = start_date - timedelta(days=days)
+
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                WITH days AS (
+                    SELECT d::date AS date FROM generate_series(%(lookback)s::date, %(end)s::date, '1 day') d
+                ),
+                fees AS (
+                    SELECT date, SUM(fee_usd) AS fee_usd
+                    FROM fee_rollup
+                    WHERE type = 'SWAP' AND date >= %(lookback)s AND date <= %(end)s
+                    GROUP BY date
+                ),
+                rolling AS (
+                    SELECT days.date,
+                           SUM(COALESCE(f.fee_usd, 0)) OVER w AS total_fees,
+                           SUM(COALESCE(s.new_users, 0)) OVER w AS total_users
+                    FROM days
+                    LEFT JOIN fees f ON f.date = days.date
+                    LEFT JOIN user_signups_daily s ON s.date = days.date
+                    WINDOW w AS (ORDER BY days.date ROWS BETWEEN %(days)s PRECEDING AND CURRENT ROW)
+                )
+                SELECT date, total_fees, total_users FROM rolling
+                WHERE date >= %(start)s
+                ORDER BY date
+            """, {"lookback": lookback, "start": start_date, "end": end_date, "days": days})
+            rows = cur.fetchall()
 
-    with get_main_db_connection() as conn_main, get_cache_db_connection() as conn_cache:
-        cur_main = conn_main.cursor()
-        cur_cache = conn_cache.cursor()
-
-        # Check for cached entry in avg_revenue_metrics
-        cur_cache.execute("SELECT * FROM avg_revenue_metrics WHERE date = %s", (snapshot_date,))
-        row = cur_cache.fetchone()
-        if row:
-            return {
-                "date": row[0],
-                "total_fees": float(row[1] or 0),
-                "total_users": row[2],
-                "active_users": row[3],
-                "avg_rev_per_user": float(row[4] or 0),
-                "avg_rev_per_active_user": float(row[5] or 0)
-            }
-
-        # Compute from raw data
-        cur_main.execute('SELECT COUNT(*) FROM "User" WHERE "createdAt" >= %s', (start_date,))
-        total_users = cur_main.fetchone()[0] or 0
-
-        cur_cache.execute("""
-            SELECT COUNT(DISTINCT from_user)
-            FROM transactions_cache
-            WHERE type = 'SWAP' AND status = 'SUCCESS' AND created_at >= %s
-        """, (start_date,))
-        active_users = cur_cache.fetchone()[0] or 0
-
-        result = {
-            "date": snapshot_date,
+        daily_sketches = fetch_daily_sketches(conn, lookback, end_date + timedelta(days=1), types=["SWAP"])
+
+    records = []
+    for day, total_fees, total_users in rows:
+        window = [
+            daily_sketches[day - timedelta(days=i)]
+            for i in range(days + 1) if day - timedelta(days=i) in daily_sketches
+        ]
+        active_users = round(hll.estimate(hll.merge(*window))) if window else 0
+        total_fees = float(total_fees or 0)
+        total_users = int(total_users or 0)
+        records.append({
+            "date": day,
             "total_fees": total_fees,
             "total_users": total_users,
             "active_users": active_users,
             "avg_rev_per_user": total_fees / total_users if total_users else 0,
             "avg_rev_per_active_user": total_fees / active_users if active_users else 0,
-        }
+        })
+
+    return pd.DataFrame(records, columns=[
+        "date", "total_fees", "total_users", "active_users", "avg_rev_per_user", "avg_rev_per_active_user"
+    ])
 
-        upsert_avg_revenue_metrics(pd.DataFrame([result]))
-        return result
+
+def fetch_avg_revenue_metrics(days: int = 30, snapshot_date: date = None) -> dict:
+    """
+    30-day monetization snapshot, read from the backfilled avg_revenue_metrics rows
+    (latest row on or before snapshot_date). Other window lengths are computed from the rollups.
+    """
+    snapshot_date = snapshot_date or date.today()
+
+    row = None
+    if days == 30:
+        with get_cache_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT date, total_fees, total_users, active_users, avg_rev_per_user, avg_rev_per_active_user
+                    FROM avg_revenue_metrics
+                    WHERE date <= %s
+                    ORDER BY date DESC
+                    LIMIT 1
+                """, (snapshot_date,))
+                row = cur.fetchone()
+
+    if row is None:
+        history = fetch_avg_revenue_metrics_history(snapshot_date, snapshot_date, days=days)
+        row = tuple(history.iloc[0])
+
+    return {
+        "date": row[0],
+        "total_fees": float(row[1] or 0),
+        "total_users": int(row[2] or 0),
+        "active_users": int(row[3] or 0),
+        "active_users_error": hll.standard_error(row[3] or 0),
+        "avg_rev_per_user": float(row[4] or 0),
+        "avg_rev_per_active_user": float(row[5] or 0)
+    }
 
 
 def fetch_avg_revenue_metrics_for_range(start_date: date, days: int = 7) -> pd.DataFrame:
     end_date = start_date + timedelta(days=days)
 
-    # Pull fees from transactions_cache via fetch_fee_series
-    fee_df = fetch_fee_series()
-    mask = (fee_df["date"] >= start_date) & (fee_df["date"] < end_date)
-    total_fees = fee_df.loc[mask, "value"].sum()
+    # Pull fees for just this range from the fee rollup
+    fee_df = fetch_fee_series(start=start_date, end=end_date)
+    total_fees = fee_df["value"].sum()
 
     with get_cache_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT COUNT(DISTINCT from_user)
-                FROM transactions_cache
-                WHERE type = 'SWAP' AND status = 'SUCCESS'
-                  AND created_at >= %s AND created_at < %s
-            """, (start_date, end_date))
-            active_users = cur.fetchone()[0] or 0
+        active_users, _ = fetch_distinct_users(conn, start=start_date, end=end_date, types=["SWAP"])
 
     return pd.DataFrame([{
         "week": start_date,
@@ -81,14 +176,67 @@ def fetch_avg_revenue_metrics_for_range(start_date: date, days: int = 7) -> pd.D
     }])
 
 
-def fetch_weekly_avg_revenue_metrics() -> pd.DataFrame:
+def fetch_weekly_revenue_metrics(start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Weekly swap fees and distinct active swappers for every week (Monday start)
+    overlapping [start_date, end_date]. Fees come from one grouped fee_rollup query;
+    active users merge each week's daily SWAP sketches, the same estimate the
+    daily avg revenue metrics use.
+    """
+    first_week = week_start(start_date)
+    after_last_week = week_start(end_date) + timedelta(days=7)
+
     with get_cache_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT week, total_fees, active_users, avg_rev_per_active_user
-                FROM weekly_avg_revenue_metrics
-                ORDER BY week
-            """)
+                SELECT DATE(date_trunc('week', date)), COALESCE(SUM(fee_usd), 0)
+                FROM fee_rollup
+                WHERE type = 'SWAP' AND date >= %s AND date < %s
+                GROUP BY 1
+            """, (first_week, after_last_week))
+            fees = {week: float(total) for week, total in cur.fetchall()}
+        daily_sketches = fetch_daily_sketches(conn, start=first_week, end=after_last_week, types=["SWAP"])
+
+    weekly_sketches = {}
+    for day, sketch in daily_sketches.items():
+        week = week_start(day)
+        weekly_sketches[week] = hll.merge(weekly_sketches[week], sketch) if week in weekly_sketches else sketch
+
+    df = pd.DataFrame([
+        {
+            "week": week,
+            "total_fees": fees.get(week, 0.0),
+            "active_users": round(hll.estimate(weekly_sketches[week])) if week in weekly_sketches else 0,
+        }
+        for week in sorted(set(fees) | set(weekly_sketches))
+    ], columns=["week", "total_fees", "active_users"])
+    df["avg_rev_per_active_user"] = (
+        df["total_fees"] / df["active_users"].where(df["active_users"] > 0)
+    ).fillna(0)
+    return df
+
+
+def fetch_weekly_avg_revenue_metrics(start: date = None, end: date = None) -> pd.DataFrame:
+    """
+    Stored weekly revenue metrics for weeks starting in [start, end].
+    """
+    query = """
+        SELECT week, total_fees, active_users, avg_rev_per_active_user
+        FROM weekly_avg_revenue_metrics
+        WHERE 1=1
+    """
+    params = []
+    if start:
+        query += " AND week >= %s"
+        params.append(start)
+    if end:
+        query += " AND week <= %s"
+        params.append(end)
+    query += " ORDER BY week"
+
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, tuple(params))
             rows = cur.fetchall()
             df = pd.DataFrame(rows, columns=[
                 "week", "total_fees", "active_users", "avg_rev_per_active_user"
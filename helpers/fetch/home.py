@@ -1,10 +1,46 @@
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+import streamlit as st
 from psycopg2.extensions import connection
-from helpers.fetch.cash_yield import fetch_cash_yield_metrics
+from helpers.connection import get_cache_db_connection
+from helpers.fetch.hourly_stats import fetch_window_stats
+from helpers.fetch.user_signups import fetch_new_usernames_since, fetch_total_users
+from helpers.fetch.user_bitmaps import fetch_cumulative_bitmap
+from helpers.upsert.lifetime_totals import COUNTER_COLUMNS
+from helpers.utils import bitmaps
+from helpers.utils.sync_state import get_last_sync
+from helpers.utils.user_keys import lookup_user_keys, normalize_username
 
 
-def fetch_home_stats(main_conn: connection, cache_conn: connection) -> dict:
+# Upper bound on staleness between ingestion runs (the rolling 24h window keeps moving)
+HOME_SNAPSHOT_TTL = 300
+
+
+def fetch_lifetime_active_users(cache_conn: connection, now: datetime) -> int:
+    """
+    Stored cumulative bitmap plus raw actives since it was built.
+    """
+    as_of, lifetime_bits = fetch_cumulative_bitmap(cache_conn, now.date(), label="all")
+    with cache_conn.cursor() as cursor:
+        query = """
+            SELECT DISTINCT from_user FROM transactions_cache
+            WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+        """
+        params = []
+        if as_of:
+            query += " AND created_at >= %s"
+            params.append(as_of + timedelta(days=1))
+        cursor.execute(query, tuple(params))
+        recent_users = {normalize_username(row[0]) for row in cursor.fetchall()}
+
+    recent_keys = lookup_user_keys(cache_conn, recent_users)
+    return (
+        bitmaps.cardinality(bitmaps.union(lifetime_bits, bitmaps.from_keys(recent_keys.values())))
+        + len(recent_users - recent_keys.keys())
+    )
+
+
+def fetch_home_stats(cache_conn: connection) -> dict:
     now = datetime.now(timezone.utc)
     window_start = now - timedelta(hours=24)
 
@@ -13,9 +49,20 @@ def fetch_home_stats(main_conn: connection, cache_conn: connection) -> dict:
         "lifetime": defaultdict(float),
     }
 
-    def fetch_transactions(scope: str, since: datetime = None):
-        query = """
-            SELECT type, from_user, amount_usd, fee_usd
+    def fetch_transactions(scope: str, since: datetime = None, count_users: bool = True):
+        query = f"""
+            SELECT
+                COUNT(*) AS transactions,
+                COUNT(*) FILTER (WHERE type = 'SWAP') AS swap_transactions,
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'SWAP'), 0) AS swap_volume,
+                COALESCE(SUM(fee_usd) FILTER (WHERE type = 'SWAP'), 0) AS swap_revenue,
+                COUNT(*) FILTER (WHERE type = 'SEND') AS send_transactions,
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'SEND'), 0) AS send_volume,
+                COUNT(*) FILTER (WHERE type = 'CASH') AS cash_transactions,
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'CASH'), 0) AS cash_volume,
+                COALESCE(SUM(fee_usd) FILTER (WHERE type = 'CASH'), 0) AS cash_revenue,
+                COALESCE(SUM(fee_usd), 0) AS revenue
+                {", COUNT(DISTINCT from_user) AS active_users" if count_users else ""}
             FROM transactions_cache
             WHERE status = 'SUCCESS'
         """
@@ -26,47 +73,47 @@ def fetch_home_stats(main_conn: connection, cache_conn: connection) -> dict:
 
         with cache_conn.cursor() as cursor:
             cursor.execute(query, tuple(params))
-            rows = cursor.fetchall()
-
-            user_set = set()
-            for typ, from_user, amount_usd, fee_usd in rows:
-                user_set.add(from_user)
-                amount = float(amount_usd or 0)
-                fee = float(fee_usd or 0)
-
-                if typ == "SWAP":
-                    results[scope]["swap_volume"] += amount
-                    results[scope]["swap_transactions"] += 1
-                    results[scope]["swap_revenue"] += fee
-                elif typ == "SEND":
-                    results[scope]["send_transactions"] += 1
-                    results[scope]["send_volume"] += amount
-                elif typ == "CASH":
-                    results[scope]["cash_transactions"] += 1
-                    results[scope]["cash_volume"] += amount
-                    results[scope]["cash_revenue"] += fee
-
-                results[scope]["transactions"] += 1
-
-            results[scope]["active_users"] = len(user_set)
-
-    # === Fetch transaction aggregates
-    fetch_transactions("24h", window_start)
-    fetch_transactions("lifetime")
-
-    # === Revenue fallback
-    with cache_conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT SUM(fee_usd) FROM transactions_cache
-            WHERE status = 'SUCCESS' AND created_at >= %s
-        """, (window_start,))
-        results["24h"]["revenue"] = float(cursor.fetchone()[0] or 0)
+            row = cursor.fetchone()
+            columns = [desc[0] for desc in cursor.description]
 
-        cursor.execute("""
-            SELECT SUM(fee_usd) FROM transactions_cache
-            WHERE status = 'SUCCESS'
-        """)
-        results["lifetime"]["revenue"] = float(cursor.fetchone()[0] or 0)
+        for column, value in zip(columns, row):
+            results[scope][column] = float(value or 0)
+
+    def fetch_lifetime_totals() -> bool:
+        with cache_conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('lifetime_totals')")
+            if cursor.fetchone()[0] is None:
+                return False
+            cursor.execute(f"""
+                SELECT {", ".join(COUNTER_COLUMNS)}, active_users
+                FROM lifetime_totals WHERE id
+            """)
+            row = cursor.fetchone()
+            columns = [desc[0] for desc in cursor.description]
+
+        if row is None:
+            return False
+        for column, value in zip(columns, row):
+            results["lifetime"][column] = float(value or 0)
+        return True
+
+    # === Last 24h: hourly rollup buckets plus the partial hours at the edges
+    with cache_conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('hourly_stats')")
+        has_hourly = cursor.fetchone()[0] is not None
+    if has_hourly:
+        window = fetch_window_stats(cache_conn, window_start, now)
+        active_24h_bits = window.pop("user_bitmap")
+        active_24h_unkeyed = window.pop("unkeyed_users")
+        results["24h"].update(window)
+    else:
+        fetch_transactions("24h", window_start)
+        active_24h_bits, active_24h_unkeyed = None, set()
+
+    # === Lifetime totals: one maintained row; scan only until ingestion has seeded it
+    if not fetch_lifetime_totals():
+        fetch_transactions("lifetime", count_users=False)
+        results["lifetime"]["active_users"] = fetch_lifetime_active_users(cache_conn, now)
 
     # === Lifetime cash stats from daily_stats
     with cache_conn.cursor() as cursor:
@@ -78,37 +125,46 @@ def fetch_home_stats(main_conn: connection, cache_conn: connection) -> dict:
         results["lifetime"]["cash_transactions"] = row[0] or 0
         results["lifetime"]["cash_volume"] = float(row[1] or 0)
 
-    # === User counts from main DB
-    with main_conn.cursor() as cursor:
-        cursor.execute('SELECT COUNT(*) FROM "User"')
-        results["lifetime"]["total_users"] = cursor.fetchone()[0]
+    # === User counts: nightly total snapshot plus the intraday-mirrored recent users (index range lookups)
+    results["lifetime"]["total_users"] = fetch_total_users(cache_conn)
+    new_usernames = fetch_new_usernames_since(cache_conn, window_start)
+    new_users = {normalize_username(name) for name in new_usernames if name}
+
+    # === New users who were also active in the last 24h
+    if active_24h_bits is not None:
+        new_keys = lookup_user_keys(cache_conn, new_users)
+        new_active_24h = (
+            bitmaps.cardinality(bitmaps.intersect(active_24h_bits, bitmaps.from_keys(new_keys.values())))
+            + len(active_24h_unkeyed & new_users)
+        )
+    else:
+        with cache_conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT DISTINCT from_user FROM transactions_cache
+                WHERE status = 'SUCCESS' AND created_at >= %s AND from_user IS NOT NULL
+            """, (window_start,))
+            new_active_24h = len({normalize_username(row[0]) for row in cursor.fetchall()} & new_users)
+
+    results["24h"]["new_users"] = len(new_usernames)
+    results["24h"]["new_active_users"] = new_active_24h
+    results["lifetime"]["new_users"] = results["lifetime"]["total_users"]
+    results["lifetime"]["new_active_users"] = results["lifetime"]["active_users"]
 
-        cursor.execute('SELECT "userId", "createdAt" FROM "User"')
-        all_users = cursor.fetchall()
-        new_users = {
-            uid for uid, created in all_users
-            if created.replace(tzinfo=timezone.utc) >= window_start
-        }
+    return results
 
-    # === Active 24h users (from cache)
-    with cache_conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT DISTINCT from_user FROM transactions_cache
-            WHERE status = 'SUCCESS' AND created_at >= %s
-        """, (window_start,))
-        active_24h_users = {row[0] for row in cursor.fetchall()}
 
-    results["24h"]["new_users"] = len(new_users)
-    results["24h"]["new_active_users"] = len(active_24h_users.intersection(new_users))
-    results["lifetime"]["new_users"] = len(all_users)
-    results["lifetime"]["new_active_users"] = results["lifetime"]["active_users"]
+@st.cache_data(ttl=HOME_SNAPSHOT_TTL, show_spinner=False)
+def _home_snapshot(watermark: str) -> dict:
+    with get_cache_db_connection() as cache_conn:
+        stats = fetch_home_stats(cache_conn)
+    return {scope: dict(values) for scope, values in stats.items()}
 
-    # === Cash yield via API
-    try:
-        lifetime_yield, yield_24h = fetch_cash_yield_metrics()
-        results["lifetime"]["cash_yield"] = lifetime_yield
-        results["24h"]["cash_yield"] = yield_24h
-    except Exception as e:
-        print(f"❌ Error fetching cash yield: {e}")
 
-    return results
+def fetch_home_snapshot() -> dict:
+    """
+    Home stats shared by every session, recomputed only when the transactions
+    watermark moves or the snapshot is older than HOME_SNAPSHOT_TTL.
+    """
+    watermark = get_last_sync("Transactions")
+    snapshot = _home_snapshot(watermark.isoformat())
+    return {scope: defaultdict(float, values) for scope, values in snapshot.items()}
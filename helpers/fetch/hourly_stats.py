@@ -0,0 +1,72 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from helpers.upsert.hourly_stats import hour_floor
+from helpers.utils import bitmaps
+from helpers.utils.safe_math import safe_float
+from helpers.utils.user_keys import lookup_user_keys, normalize_username
+
+
+def _add(stats: dict, typ: str, count, volume, fees):
+    count, volume, fees = int(count or 0), safe_float(volume), safe_float(fees)
+    stats["transactions"] += count
+    stats["revenue"] += fees
+    if typ == "SWAP":
+        stats["swap_transactions"] += count
+        stats["swap_volume"] += volume
+        stats["swap_revenue"] += fees
+    elif typ == "SEND":
+        stats["send_transactions"] += count
+        stats["send_volume"] += volume
+    elif typ == "CASH":
+        stats["cash_transactions"] += count
+        stats["cash_volume"] += volume
+        stats["cash_revenue"] += fees
+
+
+def fetch_window_stats(conn, start: datetime, end: datetime) -> dict:
+    """
+    Counters for successful transactions in [start, end), answered from whole hourly_stats
+    buckets plus one raw query for the partial hours at either edge.
+    Returns the same keys as the Home page scopes, plus `active_users`, and
+    `user_bitmap` / `unkeyed_users` for callers that need the active set itself.
+    """
+    first_full = hour_floor(start)
+    if first_full < start:
+        first_full += timedelta(hours=1)
+    last_full = max(hour_floor(end), first_full)
+
+    stats = defaultdict(float)
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT type, SUM(tx_count), SUM(volume), SUM(fees), ARRAY_AGG(active_user_bitmap)
+            FROM hourly_stats
+            WHERE hour >= %s AND hour < %s
+            GROUP BY type
+        """, (first_full, last_full))
+        bucket_bits = []
+        for typ, count, volume, fees, blobs in cur.fetchall():
+            _add(stats, typ, count, volume, fees)
+            bucket_bits.extend(bitmaps.decode(blob) for blob in blobs)
+
+        cur.execute("""
+            SELECT type, COUNT(*), SUM(amount_usd), SUM(fee_usd),
+                   ARRAY_REMOVE(ARRAY_AGG(DISTINCT from_user), NULL)
+            FROM transactions_cache
+            WHERE status = 'SUCCESS'
+              AND ((created_at >= %s AND created_at < %s) OR (created_at >= %s AND created_at < %s))
+            GROUP BY type
+        """, (start, min(first_full, end), last_full, end))
+        edge_users = set()
+        for typ, count, volume, fees, users in cur.fetchall():
+            _add(stats, typ, count, volume, fees)
+            edge_users.update(normalize_username(u) for u in users)
+
+    edge_keys = lookup_user_keys(conn, edge_users)
+    user_bits = bitmaps.union(*bucket_bits, bitmaps.from_keys(edge_keys.values()))
+    unkeyed_users = edge_users - edge_keys.keys()
+
+    stats["active_users"] = bitmaps.cardinality(user_bits) + len(unkeyed_users)
+    stats["user_bitmap"] = user_bits
+    stats["unkeyed_users"] = unkeyed_users
+    return stats
@@ -0,0 +1,35 @@
+# Index-backed lookups behind the Transactions page search box
+from helpers.fetch.wallet_addresses import lookup_wallet_owner
+
+
+def like_pattern(term: str) -> str:
+    """
+    Case-insensitive substring pattern for `term`, with LIKE wildcards escaped.
+    """
+    escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def resolve_search_usernames(conn, term: str) -> list:
+    """
+    Lower-cased usernames whose email or wallet address exactly matches `term`.
+    Both lookups are primary-key hits on the cache DB mirrors.
+    """
+    term = term.strip().lower()
+    if not term:
+        return []
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('wallet_addresses'), to_regclass('user_emails')")
+        has_wallets, has_emails = cur.fetchone()
+
+        usernames = set()
+        if has_emails and "@" in term:
+            cur.execute("SELECT username FROM user_emails WHERE email = %s", (term,))
+            usernames.update(r[0] for r in cur.fetchall())
+        if has_wallets:
+            owner = lookup_wallet_owner(conn, term)
+            if owner:
+                usernames.add(owner[1])
+
+    return sorted(u.lower() for u in usernames if u)
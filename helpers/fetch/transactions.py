@@ -3,13 +3,27 @@
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 import pandas as pd
+import streamlit as st
 
 from helpers.connection import get_cache_db_connection, get_main_db_connection
+from helpers.fetch.search import like_pattern, resolve_search_usernames
 from helpers.utils.transactions import parse_txn_json, normalize, sanitize_username
 from helpers.utils.constants import CHAIN_ID_MAP
+from helpers.utils.sync_state import get_last_sync
 
+# Upper bound on how stale the filtered summary can be between ingestion runs
+TRANSACTION_SUMMARY_TTL = 300
 
-def fetch_transactions_filtered(
+
+TRANSACTION_COLUMNS = [
+    "created_at", "type", "status", "from_user", "to_user",
+    "from_token", "from_chain", "to_token", "to_chain",
+    "amount_usd", "tx_hash", "tx_display"
+]
+
+
+def _transaction_filters(
+    conn,
     tx_type=None,
     min_amount=None,
     from_chain=None,
@@ -18,68 +32,141 @@ def fetch_transactions_filtered(
     to_token=None,
     search_user_or_email=None,
     since_date=None,
-    limit=500,
-    username=None,  # <- for backwards compatibility
-) -> pd.DataFrame:
+    username=None,
+):
+    """
+    WHERE clause (starting with "WHERE 1=1") and params shared by the transaction table fetchers.
+    """
+    query = " WHERE 1=1"
+    params = []
+
+    if tx_type and tx_type != "All":
+        query += ' AND type = %s'
+        params.append(tx_type)
+    if min_amount:
+        query += ' AND amount_usd >= %s'
+        params.append(min_amount)
+    if from_chain:
+        query += ' AND from_chain = %s'
+        params.append(from_chain)
+    if to_chain:
+        query += ' AND to_chain = %s'
+        params.append(to_chain)
+    if from_token:
+        query += ' AND from_token = %s'
+        params.append(from_token)
+    if to_token:
+        query += ' AND to_token = %s'
+        params.append(to_token)
+
+    # Allow both old `username` and new `search_user_or_email`
+    if username:
+        query += ' AND (LOWER(from_user) = %s OR LOWER(to_user) = %s)'
+        username_lower = username.lower()
+        params.extend([username_lower, username_lower])
+    elif search_user_or_email:
+        # Substring match on either side (trigram-indexed), plus exact email / wallet hits
+        search_str = like_pattern(search_user_or_email.strip())
+        resolved = resolve_search_usernames(conn, search_user_or_email)
+        if resolved:
+            query += """
+                AND (LOWER(from_user) LIKE %s OR LOWER(to_user) LIKE %s
+                     OR LOWER(from_user) = ANY(%s) OR LOWER(to_user) = ANY(%s))
+            """
+            params.extend([search_str, search_str, resolved, resolved])
+        else:
+            # No equality arms: each OR branch must be indexable or the whole OR is a seq scan
+            query += " AND (LOWER(from_user) LIKE %s OR LOWER(to_user) LIKE %s)"
+            params.extend([search_str, search_str])
+
+    if since_date:
+        query += ' AND created_at >= %s'
+        params.append(since_date)
+
+    return query, params
+
+
+def _to_frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=TRANSACTION_COLUMNS)
+    df["from_user"] = df["from_user"].apply(sanitize_username)
+    df["to_user"] = df["to_user"].apply(sanitize_username)
+    return df
+
+
+def fetch_transactions_filtered(limit=500, **filters) -> pd.DataFrame:
     with get_cache_db_connection() as conn:
+        where, params = _transaction_filters(conn, **filters)
         with conn.cursor() as cur:
-            query = '''
-                SELECT created_at, type, status, from_user, to_user,
-                       from_token, from_chain, to_token, to_chain,
-                       amount_usd, tx_hash, tx_display
+            cur.execute(f"""
+                SELECT {", ".join(TRANSACTION_COLUMNS)}
                 FROM transactions_cache
-                WHERE 1=1
-            '''
-            params = []
-
-            if tx_type and tx_type != "All":
-                query += ' AND type = %s'
-                params.append(tx_type)
-            if min_amount:
-                query += ' AND amount_usd >= %s'
-                params.append(min_amount)
-            if from_chain:
-                query += ' AND from_chain = %s'
-                params.append(from_chain)
-            if to_chain:
-                query += ' AND to_chain = %s'
-                params.append(to_chain)
-            if from_token:
-                query += ' AND from_token = %s'
-                params.append(from_token)
-            if to_token:
-                query += ' AND to_token = %s'
-                params.append(to_token)
-
-            # Allow both old `username` and new `search_user_or_email`
-            if username:
-                query += ' AND (LOWER(from_user) = %s OR LOWER(to_user) = %s)'
-                username_lower = username.lower()
-                params.extend([username_lower, username_lower])
-            elif search_user_or_email:
-                search_str = f"%{search_user_or_email.lower()}%"
-                query += ' AND (LOWER(from_user) LIKE %s OR LOWER(to_user) LIKE %s)'
-                params.extend([search_str, search_str])
-
-            if since_date:
-                query += ' AND created_at >= %s'
-                params.append(since_date)
-
-            query += ' ORDER BY created_at DESC LIMIT %s'
-            params.append(limit)
-
-            cur.execute(query, params)
+                {where}
+                ORDER BY created_at DESC LIMIT %s
+            """, [*params, limit])
             rows = cur.fetchall()
 
-    cols = [
-        "created_at", "type", "status", "from_user", "to_user",
-        "from_token", "from_chain", "to_token", "to_chain",
-        "amount_usd", "tx_hash", "tx_display"
-    ]
+    return _to_frame(rows)
 
-    df = pd.DataFrame(rows, columns=cols)
-    df["from_user"] = df["from_user"].apply(sanitize_username)
-    df["to_user"] = df["to_user"].apply(sanitize_username)
+
+def fetch_transactions_page(page_size=100, after=None, **filters):
+    """
+    One page of transactions, newest first, using a keyset cursor on (created_at, tx_hash).
+    `after` is the cursor returned for the previous page (None for the first page).
+    Returns (df, next_cursor); next_cursor is None on the last page.
+    Cost per page is independent of how deep into history it is.
+    """
+    with get_cache_db_connection() as conn:
+        where, params = _transaction_filters(conn, **filters)
+        if after:
+            where += " AND (created_at, tx_hash) < (%s, %s)"
+            params.extend(after)
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {", ".join(TRANSACTION_COLUMNS)}
+                FROM transactions_cache
+                {where}
+                ORDER BY created_at DESC, tx_hash DESC
+                LIMIT %s
+            """, [*params, page_size + 1])
+            rows = cur.fetchall()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    created_at_idx, tx_hash_idx = TRANSACTION_COLUMNS.index("created_at"), TRANSACTION_COLUMNS.index("tx_hash")
+    next_cursor = (rows[-1][created_at_idx], rows[-1][tx_hash_idx]) if has_more else None
+    return _to_frame(rows), next_cursor
+
+
+def fetch_transaction_summary(**filters) -> pd.DataFrame:
+    """
+    Count, volume and fees by type and status over the full filtered set (not just one page),
+    aggregated in SQL so no transaction rows leave the database.
+    Shared across reruns and sessions per filter set until the transactions watermark
+    moves or TRANSACTION_SUMMARY_TTL passes, so paging doesn't re-run the aggregate.
+    """
+    watermark = get_last_sync("Transactions")
+    return _transaction_summary(watermark.isoformat(), tuple(sorted(filters.items())))
+
+
+@st.cache_data(ttl=TRANSACTION_SUMMARY_TTL, show_spinner=False)
+def _transaction_summary(watermark: str, filter_items: tuple) -> pd.DataFrame:
+    filters = dict(filter_items)
+    with get_cache_db_connection() as conn:
+        where, params = _transaction_filters(conn, **filters)
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT type, status, COUNT(*),
+                       COALESCE(SUM(amount_usd), 0), COALESCE(SUM(fee_usd), 0)
+                FROM transactions_cache
+                {where}
+                GROUP BY type, status
+                ORDER BY type, status
+            """, params)
+            rows = cur.fetchall()
+
+    df = pd.DataFrame(rows, columns=["type", "status", "tx_count", "volume_usd", "fee_usd"])
+    df["volume_usd"] = pd.to_numeric(df["volume_usd"])
+    df["fee_usd"] = pd.to_numeric(df["fee_usd"])
     return df
 
 
@@ -1,7 +1,6 @@
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from psycopg2.extras import RealDictCursor
-from collections import defaultdict
 
 from helpers.connection import get_cache_db_connection, get_main_db_connection
 
@@ -132,94 +131,179 @@ def get_user_daily_volume(username: str):
         return pd.DataFrame(), pd.DataFrame()
 
 
-def get_referral_mapping():
+def _midnight(day, like: datetime) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=like.tzinfo)
+
+
+def _activity_window(start_date=None, end_date=None):
     """
-    Returns { referred_username: referrer_username } from the main DB.
+    Splits an inclusive [start_date, end_date] window (either side open when None) into the
+    whole days user_daily_activity can answer, as (first_day, after_last_day) or None,
+    and the partial-day edges that still come from transactions_cache, as half-open ranges.
     """
-    with get_main_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT r.username AS referred_username, u.username AS referrer_username
-                FROM "User" r
-                JOIN "User" u ON r."referredBy" = u."referId"
-                WHERE r.username IS NOT NULL AND u.username IS NOT NULL
-            """)
-            return dict(cur.fetchall())
+    end_excl = end_date + timedelta(microseconds=1) if end_date else None
+
+    first_day = None
+    if start_date:
+        first_day = start_date.date()
+        if _midnight(first_day, start_date) < start_date:
+            first_day += timedelta(days=1)
+    after_last_day = end_excl.date() if end_excl else None
+
+    if first_day and after_last_day and first_day >= after_last_day:
+        return None, [(start_date, end_excl)]
+
+    edges = []
+    if start_date and _midnight(first_day, start_date) > start_date:
+        edges.append((start_date, _midnight(first_day, start_date)))
+    if end_excl and _midnight(after_last_day, end_excl) < end_excl:
+        edges.append((_midnight(after_last_day, end_excl), end_excl))
+    return (first_day, after_last_day), edges
+
+
+def _user_totals_query(cur, tx_type, start_date=None, end_date=None, chains=None, referred_only=False):
+    """
+    SQL (and params) for SUM(amount_usd) per user over successful `tx_type` transactions in
+    the window: whole days from user_daily_activity plus raw rows for the partial days at the edges.
+    With `referred_only`, only users present in the referrals table are summed.
+    """
+    cur.execute("SELECT to_regclass('user_daily_activity')")
+    if cur.fetchone()[0] is None:
+        days, edges = None, [(start_date, end_date + timedelta(microseconds=1) if end_date else None)]
+    else:
+        days, edges = _activity_window(start_date, end_date)
+
+    parts, params = [], []
+
+    if days is not None:
+        first_day, after_last_day = days
+        clauses = ["type = %s"]
+        params.append(tx_type)
+        if first_day:
+            clauses.append("date >= %s")
+            params.append(first_day)
+        if after_last_day:
+            clauses.append("date < %s")
+            params.append(after_last_day)
+        if chains:
+            clauses.append("chain = ANY(%s)")
+            params.append(chains)
+        if referred_only:
+            clauses.append("username IN (SELECT referred_user FROM referrals)")
+        parts.append(f"""
+            SELECT username, volume_usd AS total
+            FROM user_daily_activity
+            WHERE {" AND ".join(clauses)}
+        """)
+
+    if edges:
+        ranges = []
+        clauses = ["status = 'SUCCESS'", "from_user IS NOT NULL", "type = %s"]
+        params.append(tx_type)
+        for lo, hi in edges:
+            bounds = []
+            if lo:
+                bounds.append("created_at >= %s")
+                params.append(lo)
+            if hi:
+                bounds.append("created_at < %s")
+                params.append(hi)
+            ranges.append(f"({' AND '.join(bounds) or 'TRUE'})")
+        clauses.append(f"({' OR '.join(ranges)})")
+        if chains:
+            clauses.append("from_chain = ANY(%s)")
+            params.append(chains)
+        if referred_only:
+            clauses.append("from_user IN (SELECT referred_user FROM referrals)")
+        parts.append(f"""
+            SELECT from_user AS username, amount_usd AS total
+            FROM transactions_cache
+            WHERE {" AND ".join(clauses)}
+        """)
+
+    query = f"""
+        SELECT username, SUM(total) AS total
+        FROM ({" UNION ALL ".join(parts)}) AS activity
+        GROUP BY username
+    """
+    return query, params
+
+
+def _user_totals(cur, tx_type, start_date=None, end_date=None, chains=None, limit=None):
+    """
+    [(username, total)] for the window, largest total first.
+    """
+    query, params = _user_totals_query(cur, tx_type, start_date, end_date, chains)
+    query += " ORDER BY total DESC"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    cur.execute(query, params)
+    return cur.fetchall()
 
 
 def fetch_top_users_by_metric(conn, metric="swap", start_date=None, end_date=None, chains=None, limit=50):
+    """
+    Top users by swap / cash volume, or top referrers by their referred users' swap volume,
+    for an inclusive [start_date, end_date] window (open-ended when None).
+    """
     metric = metric.lower()
 
     if metric == "referrals":
-        referral_map = get_referral_mapping()
-        if not referral_map:
-            return []
-
-        # Step 1: Get volume for referred users
         with conn.cursor() as cur:
-            where_clauses = ["status = 'SUCCESS'", "type = 'SWAP'", "from_user = ANY(%s)"]
-            params = [list(referral_map.keys())]
-
-            if start_date:
-                where_clauses.append("created_at >= %s")
-                params.append(start_date)
-            if end_date:
-                where_clauses.append("created_at <= %s")
-                params.append(end_date)
-            if chains:
-                where_clauses.append("from_chain = ANY(%s)")
-                params.append(chains)
-
-            query = f"""
-                SELECT from_user, SUM(amount_usd)
-                FROM transactions_cache
-                WHERE {" AND ".join(where_clauses)}
-                GROUP BY from_user
-            """
-            cur.execute(query, params)
-            referred_volumes = {user: float(vol) for user, vol in cur.fetchall()}
-
-        # Step 2: Aggregate by referrer
-        aggregated = defaultdict(lambda: {"count": 0, "volume": 0.0})
-        for referred_user, referrer in referral_map.items():
-            aggregated[referrer]["count"] += 1
-            if referred_user in referred_volumes:
-                aggregated[referrer]["volume"] += referred_volumes[referred_user]
-
-        # Step 3: Sort and return top N
-        top = sorted(aggregated.items(), key=lambda x: x[1]["volume"], reverse=True)[:limit]
-        return [(referrer, data) for referrer, data in top]
+            cur.execute("SELECT to_regclass('referrals')")
+            if cur.fetchone()[0] is None:
+                return []
+
+            # Referred users' swap volume, joined to their referrer and aggregated in one query
+            volumes, params = _user_totals_query(cur, "SWAP", start_date, end_date, chains, referred_only=True)
+            cur.execute(f"""
+                SELECT r.referrer_user, COUNT(*) AS referral_count, COALESCE(SUM(v.total), 0) AS volume
+                FROM referrals r
+                LEFT JOIN ({volumes}) AS v ON v.username = r.referred_user
+                GROUP BY r.referrer_user
+                ORDER BY volume DESC
+                LIMIT %s
+            """, [*params, limit])
+            return [
+                (referrer, {"count": int(count), "volume": float(volume)})
+                for referrer, count, volume in cur.fetchall()
+            ]
 
     # === SWAP or CASH logic ===
     if metric == "swap":
-        filter_clause = "type = 'SWAP'"
-        value_col = "amount_usd"
+        tx_type = "SWAP"
     elif metric == "cash":
-        filter_clause = "type = 'CASH'"
-        value_col = "amount_usd"
+        tx_type = "CASH"
     else:
         raise ValueError(f"Unsupported leaderboard metric: {metric}")
 
-    query = f"""
-        SELECT from_user AS username, SUM({value_col}) AS total
-        FROM transactions_cache
-        WHERE status = 'SUCCESS' AND from_user IS NOT NULL AND {filter_clause}
-    """
-    params = []
+    with conn.cursor() as cur:
+        return _user_totals(cur, tx_type, start_date, end_date, chains, limit=limit)
 
-    if start_date:
-        query += " AND created_at >= %s"
-        params.append(start_date)
-    if end_date:
-        query += " AND created_at <= %s"
-        params.append(end_date)
-    if chains:
-        query += " AND from_chain = ANY(%s)"
-        params.append(chains)
-
-    query += " GROUP BY from_user ORDER BY total DESC LIMIT %s"
-    params.append(limit)
 
+def fetch_leaderboard_snapshot(conn, window_key, metric="swap", chain=None, limit=50):
+    """
+    Precomputed leaderboard for a preset window, in the same shape as fetch_top_users_by_metric,
+    plus the transactions watermark it reflects. Returns (None, None) when no snapshot is stored.
+    """
     with conn.cursor() as cur:
-        cur.execute(query, params)
-        return cur.fetchall()
+        cur.execute("SELECT to_regclass('leaderboard_snapshots')")
+        if cur.fetchone()[0] is None:
+            return None, None
+        cur.execute("""
+            SELECT username, value, referral_count, watermark
+            FROM leaderboard_snapshots
+            WHERE window_key = %s AND metric = %s AND chain = %s AND rank <= %s
+            ORDER BY rank
+        """, (window_key, metric.lower(), chain or "all", limit))
+        rows = cur.fetchall()
+
+    if not rows:
+        return None, None
+
+    watermark = rows[0][3]
+    if metric.lower() == "referrals":
+        return [(u, {"count": int(c or 0), "volume": float(v)}) for u, v, c, _ in rows], watermark
+    return [(u, v) for u, v, _, _ in rows], watermark
@@ -0,0 +1,51 @@
+from helpers.utils import bitmaps
+
+
+def fetch_user_bitmaps(conn, start=None, end=None, dimension: str = "type", labels=None) -> dict:
+    """
+    Loads stored activity bitmaps as {(date, label): bitmap} for dates in [start, end).
+    """
+    query = "SELECT date, label, bitmap FROM daily_user_bitmaps WHERE dimension = %s"
+    params = [dimension]
+
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date < %s"
+        params.append(end)
+    if labels:
+        query += " AND label = ANY(%s)"
+        params.append(list(labels))
+
+    with conn.cursor() as cur:
+        cur.execute(query, tuple(params))
+        return {(day, label): bitmaps.decode(blob) for day, label, blob in cur.fetchall()}
+
+
+def fetch_union_bitmap(conn, start=None, end=None, dimension: str = "type", labels=None):
+    """
+    Users active on any day in [start, end), optionally restricted to some labels
+    (e.g. transaction types or chains).
+    """
+    return bitmaps.union(*fetch_user_bitmaps(conn, start, end, dimension, labels).values())
+
+
+def fetch_cumulative_bitmap(conn, before, label: str = "all"):
+    """
+    Returns (as_of_date, bitmap) for the latest cumulative bitmap dated strictly before `before`,
+    i.e. every user active up to and including as_of_date. (None, empty) if nothing is stored yet.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT date, bitmap
+            FROM daily_user_bitmaps
+            WHERE dimension = 'cumulative' AND label = %s AND date < %s
+            ORDER BY date DESC
+            LIMIT 1
+        """, (label, before))
+        row = cur.fetchone()
+
+    if not row:
+        return None, bitmaps.decode(None)
+    return row[0], bitmaps.decode(row[1])
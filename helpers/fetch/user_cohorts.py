@@ -0,0 +1,51 @@
+import pandas as pd
+from helpers.connection import get_cache_db_connection
+
+
+def fetch_rolling_active_users(start=None, end=None) -> pd.DataFrame:
+    query = """
+        SELECT date, dau, wau, mau, stickiness
+        FROM rolling_active_users
+        WHERE 1=1
+    """
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date <= %s"
+        params.append(end)
+    query += " ORDER BY date ASC"
+
+    with get_cache_db_connection() as conn:
+        df = pd.read_sql(query, conn, params=tuple(params))
+
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def fetch_cohort_retention(start=None, end=None) -> pd.DataFrame:
+    """
+    Returns one row per (cohort_week, week_offset) for cohorts that signed up in [start, end].
+    """
+    query = """
+        SELECT cohort_week, week_offset, cohort_size, retained_users, retention_rate
+        FROM cohort_retention
+        WHERE 1=1
+    """
+    params = []
+    if start:
+        query += " AND cohort_week >= %s"
+        params.append(start)
+    if end:
+        query += " AND cohort_week <= %s"
+        params.append(end)
+    query += " ORDER BY cohort_week ASC, week_offset ASC"
+
+    with get_cache_db_connection() as conn:
+        df = pd.read_sql(query, conn, params=tuple(params))
+
+    if not df.empty:
+        df["cohort_week"] = pd.to_datetime(df["cohort_week"])
+    return df
@@ -1,44 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pandas as pd
+import streamlit as st
 from helpers.api_utils import fetch_api_metric, fetch_api_json, fetch_api_raw
-from helpers.connection import get_main_db_connection
+from helpers.connection import get_cache_db_connection, get_main_db_connection
+from helpers.fetch.wallet_addresses import fetch_user_wallets, lookup_wallet_owner
 
-def fetch_user_profile_summary(conn, identifier: str) -> dict | None:
+# Profile metrics change slowly; repeat lookups of the same user within this window are served from cache
+PROFILE_TTL = 300
+
+
+class MetricsUnavailableError(RuntimeError):
+    """
+    The user resolved but the metrics API failed. Raised out of the cached lookup
+    so the failure is not cached; carries the resolved profile.
+    """
+    def __init__(self, profile: dict):
+        super().__init__(f"Metrics unavailable for {profile.get('username') or profile.get('email')}")
+        self.profile = profile
+
+def fetch_user_profile_summary(conn, identifier: str, cache_conn=None) -> dict | None:
     """
     Attempts to match user by username, email, or wallet address.
     Returns basic profile metadata if found.
+    Each match is its own single-predicate branch, so each can use its own index.
+    With `cache_conn`, the wallet is resolved through the cache DB's wallet_addresses mirror
+    and matched by user id, instead of joining every Wallet on the main DB; wallets not
+    mirrored yet fall back to one main-DB lookup.
+    """
+    owner = lookup_wallet_owner(cache_conn, identifier, main_conn=conn) if cache_conn else None
+    wallet_branch = """
+                SELECT 3, u."userId", u.username, u.email, u."createdAt"
+                FROM "User" u
+                WHERE u."userId" = %s
+    """ if cache_conn else """
+                SELECT 3, u."userId", u.username, u.email, u."createdAt"
+                FROM "Wallet" w
+                JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
+                JOIN "User" u ON wa."userId" = u."userId"
+                WHERE LOWER(w.address) = LOWER(%s)
     """
+    wallet_param = (owner[0] if owner else None) if cache_conn else identifier
+
     with conn.cursor() as cur:
-        cur.execute("""
-            SELECT u."userId", u.username, u.email, u."createdAt"
-            FROM "User" u
-            WHERE LOWER(u.username) = LOWER(%s)
-               OR LOWER(u.email) = LOWER(%s)
-               OR EXISTS (
-                   SELECT 1 FROM "Wallet" w
-                   JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
-                   WHERE wa."userId" = u."userId" AND LOWER(w.address) = LOWER(%s)
-               )
+        cur.execute(f"""
+            SELECT * FROM (
+                SELECT 1 AS priority, u."userId", u.username, u.email, u."createdAt"
+                FROM "User" u
+                WHERE LOWER(u.username) = LOWER(%s)
+                UNION ALL
+                SELECT 2, u."userId", u.username, u.email, u."createdAt"
+                FROM "User" u
+                WHERE LOWER(u.email) = LOWER(%s)
+                UNION ALL
+                {wallet_branch}
+            ) matches
+            ORDER BY priority
             LIMIT 1
-        """, (identifier, identifier, identifier))
+        """, (identifier, identifier, wallet_param))
         row = cur.fetchone()
 
     if not row:
         return None
 
     return {
-        "userId": row[0],
-        "username": row[1],
-        "email": row[2],
-        "createdAt": row[3],
+        "userId": row[1],
+        "username": row[2],
+        "email": row[3],
+        "createdAt": row[4],
     }
 
 
-def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str = None) -> dict:
-    if not user_identifier:
-        return {}
+def _fetch_wallets(user_identifier: str, user_id=None) -> dict:
+    if user_id:
+        with get_cache_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regclass('wallet_addresses')")
+                has_mirror = cur.fetchone()[0] is not None
+            wallets = fetch_user_wallets(conn, user_id) if has_mirror else {}
+        # Users created since the last wallet sync have nothing mirrored yet
+        if any(wallets.values()):
+            return wallets
 
-    # === Wallet Addresses ===
     with get_main_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
@@ -53,17 +96,26 @@ def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str =
                 WHERE LOWER(u.username) = LOWER(%s) OR LOWER(u.email) = LOWER(%s)
             """, (user_identifier, user_identifier))
             row = cur.fetchone()
-            wallets = dict(zip(["evm", "solana", "btc", "sui"], row or [None] * 4))
+            return dict(zip(["evm", "solana", "btc", "sui"], row or [None] * 4))
+
+
+def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str = None, user_id=None) -> dict:
+    """
+    Wallets plus lifetime and date-filtered metrics for a username or email.
+    With `user_id`, wallets come from the cache DB mirror rather than the main DB.
+    If any metrics API call fails, only {"profile": wallets} is returned.
+    """
+    if not user_identifier:
+        return {}
 
     # === Full profile ===
-    try:
-        df = fetch_api_metric(f"user/metrics/{user_identifier}")
-        if df.empty:
-            return {"profile": wallets}
-        metrics = df.iloc[0].to_dict()
-    except Exception as e:
-        print(f"❌ Failed to fetch full metrics: {e}")
-        return {"profile": wallets}
+    def fetch_metrics():
+        try:
+            df = fetch_api_metric(f"user/metrics/{user_identifier}")
+            return None if df.empty else df.iloc[0].to_dict()
+        except Exception as e:
+            print(f"❌ Failed to fetch full metrics: {e}")
+            return None
 
     # === Filtered volume (dict from JSON) ===
     def fetch_filtered_volume():
@@ -72,7 +124,7 @@ def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str =
             return fetch_api_json(url)
         except Exception as e:
             print(f"❌ Error fetching filtered volume: {e}")
-            return {}
+            return None
 
     # === Filtered referrals (raw integer) ===
     def fetch_filtered_referrals():
@@ -81,7 +133,22 @@ def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str =
             return int(fetch_api_raw(url))
         except Exception as e:
             print(f"❌ Error fetching filtered referrals: {e}")
-            return 0
+            return None
+
+    # === Wallets and all three API calls are independent: run them side by side ===
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        wallets_future = pool.submit(_fetch_wallets, user_identifier, user_id)
+        metrics_future = pool.submit(fetch_metrics)
+        volume_future = pool.submit(fetch_filtered_volume)
+        referrals_future = pool.submit(fetch_filtered_referrals)
+
+    wallets = wallets_future.result()
+    metrics = metrics_future.result()
+    filtered_volume = volume_future.result()
+    filtered_referrals = referrals_future.result()
+    # Any failed call leaves out the metrics entirely, rather than reporting zeros
+    if metrics is None or filtered_volume is None or filtered_referrals is None:
+        return {"profile": wallets}
 
     return {
         "profile": wallets,
@@ -92,7 +159,42 @@ def fetch_user_metrics_full(user_identifier: str, start: str = None, end: str =
             "referrals": metrics.get("referrals", 0),
         },
         "filtered": {
-            "volume": fetch_filtered_volume(),
-            "referrals": fetch_filtered_referrals(),
+            "volume": filtered_volume,
+            "referrals": filtered_referrals,
         }
     }
+
+
+def fetch_user_stats(identifier: str, start: str = None, end: str = None):
+    """
+    (profile summary, full metrics) for a username, email or wallet address,
+    or (None, None) if no user matches, or (profile, None) if the metrics API failed.
+    Resolved profiles are cached per identifier and date filter for PROFILE_TTL;
+    misses and failures are not cached.
+    """
+    identifier = (identifier or "").strip()
+    if not identifier:
+        return None, None
+    try:
+        return _user_stats(identifier.lower(), start, end)
+    except LookupError:
+        return None, None
+    except MetricsUnavailableError as e:
+        print(f"⚠️ {e}")
+        return e.profile, None
+
+
+@st.cache_data(ttl=PROFILE_TTL, show_spinner=False)
+def _user_stats(identifier: str, start: str, end: str):
+    with get_main_db_connection() as conn, get_cache_db_connection() as cache_conn:
+        profile = fetch_user_profile_summary(conn, identifier, cache_conn=cache_conn)
+    if not profile:
+        raise LookupError(identifier)
+
+    resolved_identifier = profile.get("username") or profile.get("email")
+    metrics = fetch_user_metrics_full(
+        resolved_identifier, start=start, end=end, user_id=profile.get("userId")
+    ) if resolved_identifier else {}
+    if resolved_identifier and "lifetime" not in metrics:
+        raise MetricsUnavailableError(profile)
+    return profile, metrics
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+
+def fetch_total_users(conn) -> int:
+    """
+    Every main-DB user: the nightly user_totals snapshot plus users mirrored into
+    recent_users since it was taken. Before the first snapshot, falls back to the
+    cached signup series (users with a username only).
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('user_totals'), to_regclass('recent_users')")
+        has_totals, has_recent = cur.fetchone()
+        if has_totals and has_recent:
+            cur.execute("""
+                SELECT t.total_users + (
+                    SELECT COUNT(*) FROM recent_users r WHERE r.created_at >= t.as_of
+                )
+                FROM user_totals t WHERE t.id
+            """)
+            row = cur.fetchone()
+            if row:
+                return row[0]
+
+        cur.execute("""
+            SELECT date, cumulative_users FROM user_signups_daily
+            ORDER BY date DESC LIMIT 1
+        """)
+        row = cur.fetchone()
+        if not row:
+            cur.execute("SELECT COUNT(*) FROM users WHERE username IS NOT NULL")
+            return cur.fetchone()[0]
+
+        last_day, total = row
+        cur.execute("""
+            SELECT COUNT(*) FROM users
+            WHERE username IS NOT NULL AND created_at >= %s
+        """, (last_day + timedelta(days=1),))
+        return total + cur.fetchone()[0]
+
+
+def fetch_new_usernames_since(conn, since: datetime) -> list:
+    """
+    Usernames of every user created since `since` (None for users who have not
+    picked one yet), from recent_users, or the cached users table before it exists.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('recent_users')")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT username FROM recent_users WHERE created_at >= %s", (since,))
+        else:
+            cur.execute("""
+                SELECT username FROM users
+                WHERE username IS NOT NULL AND created_at >= %s
+            """, (since,))
+        return [row[0] for row in cur.fetchall()]
+
+
+def fetch_signup_counts(conn, start=None, end=None) -> dict:
+    """
+    {date: new_users} for days in [start, end).
+    """
+    query = "SELECT date, new_users FROM user_signups_daily WHERE 1=1"
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date < %s"
+        params.append(end)
+
+    with conn.cursor() as cur:
+        cur.execute(query, tuple(params))
+        return dict(cur.fetchall())
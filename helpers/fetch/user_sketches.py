@@ -0,0 +1,61 @@
+from helpers.utils import hll
+
+
+def fetch_distinct_users(conn, start=None, end=None, chains=None, types=None):
+    """
+    Estimated distinct active users over days in [start, end), optionally limited to
+    some chains and/or transaction types, by merging the stored daily sketches.
+    Returns (estimate, standard_error).
+    """
+    query = "SELECT sketch FROM daily_user_sketches WHERE 1=1"
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date < %s"
+        params.append(end)
+    if chains:
+        query += " AND chain = ANY(%s)"
+        params.append(list(chains))
+    if types:
+        query += " AND type = ANY(%s)"
+        params.append(list(types))
+
+    with conn.cursor() as cur:
+        cur.execute(query, tuple(params))
+        sketches = [hll.decode(row[0]) for row in cur.fetchall()]
+
+    if not sketches:
+        return 0, 0.0
+    count = round(hll.estimate(hll.merge(*sketches)))
+    return count, hll.standard_error(count)
+
+
+def fetch_daily_sketches(conn, start=None, end=None, chains=None, types=None) -> dict:
+    """
+    {date: sketch} for days in [start, end), each merged across the selected chains and types.
+    """
+    query = "SELECT date, sketch FROM daily_user_sketches WHERE 1=1"
+    params = []
+    if start:
+        query += " AND date >= %s"
+        params.append(start)
+    if end:
+        query += " AND date < %s"
+        params.append(end)
+    if chains:
+        query += " AND chain = ANY(%s)"
+        params.append(list(chains))
+    if types:
+        query += " AND type = ANY(%s)"
+        params.append(list(types))
+
+    with conn.cursor() as cur:
+        cur.execute(query, tuple(params))
+        rows = cur.fetchall()
+
+    daily = {}
+    for day, blob in rows:
+        daily[day] = hll.merge(daily[day], hll.decode(blob)) if day in daily else hll.decode(blob)
+    return daily
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# Resolved owners kept in-process; misses are not cached so newly synced wallets show up
+WALLET_OWNER_CACHE_SIZE = 50_000
+
+# Owners can change or disappear upstream; entries older than this are re-read
+WALLET_OWNER_TTL = 600
+
+_owner_cache = OrderedDict()
+_owner_cache_lock = Lock()
+
+
+def normalize_address(address) -> str:
+    return str(address or "").strip().lower()
+
+
+def clear_wallet_owner_cache():
+    """
+    Drops every cached owner, e.g. after this process has re-synced wallet_addresses.
+    """
+    with _owner_cache_lock:
+        _owner_cache.clear()
+
+
+def _lookup_main_wallet_owner(main_conn, address):
+    with main_conn.cursor() as cur:
+        cur.execute("""
+            SELECT u."userId", u.username
+            FROM "Wallet" w
+            JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
+            JOIN "User" u ON wa."userId" = u."userId"
+            WHERE LOWER(w.address) = %s
+            ORDER BY u."createdAt"
+            LIMIT 1
+        """, (address,))
+        return cur.fetchone()
+
+
+def lookup_wallet_owner(conn, address, main_conn=None):
+    """
+    (user_id, username) owning `address` (any casing), or None.
+    Served from an in-process LRU (entries expire after WALLET_OWNER_TTL),
+    then the cache DB's wallet_addresses primary key. With `main_conn`, a wallet
+    not mirrored yet (created since the last sync) is looked up once on the main DB.
+    `conn` is a cache DB connection.
+    """
+    key = normalize_address(address)
+    if not key:
+        return None
+
+    now = time.monotonic()
+    with _owner_cache_lock:
+        if key in _owner_cache:
+            owner, cached_at = _owner_cache[key]
+            if now - cached_at < WALLET_OWNER_TTL:
+                _owner_cache.move_to_end(key)
+                return owner
+            del _owner_cache[key]
+
+    row = None
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('wallet_addresses')")
+        if cur.fetchone()[0] is not None:
+            cur.execute("SELECT user_id, username FROM wallet_addresses WHERE address_lower = %s", (key,))
+            row = cur.fetchone()
+
+    if row is None and main_conn is not None:
+        row = _lookup_main_wallet_owner(main_conn, key)
+    if row is None:
+        return None
+
+    owner = (row[0], row[1])
+    with _owner_cache_lock:
+        _owner_cache[key] = (owner, now)
+        if len(_owner_cache) > WALLET_OWNER_CACHE_SIZE:
+            _owner_cache.popitem(last=False)
+    return owner
+
+
+def fetch_user_wallets(conn, user_id) -> dict:
+    """
+    One address per chain family for a user, from the cache DB mirror.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT
+                MAX(CASE WHEN chain_type = 'ETHEREUM' THEN address END) AS evm,
+                MAX(CASE WHEN chain_type = 'SOLANA' THEN address END) AS solana,
+                MAX(CASE WHEN chain_type = 'BITCOIN' THEN address END) AS btc,
+                MAX(CASE WHEN chain_type = 'SUI' THEN address END) AS sui
+            FROM wallet_addresses
+            WHERE user_id = %s
+        """, (user_id,))
+        row = cur.fetchone()
+    return dict(zip(["evm", "solana", "btc", "sui"], row or [None] * 4))
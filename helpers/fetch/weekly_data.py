@@ -48,70 +48,40 @@ def fetch_swap_series(start: Optional[datetime] = None, end: Optional[datetime]
         for row in rows
     ]
 
-def fetch_weekly_stats(metric: str) -> pd.DataFrame:
-    with get_cache_db_connection() as conn:
-        df = pd.read_sql("""
-            SELECT week_start_date AS week, value, quantity
-            FROM weekly_stats
-            WHERE metric = %s
-            ORDER BY week
-        """, conn, params=(metric,))
-    return df
-
-
-def fetch_weekly_swap_revenue(conn) -> pd.DataFrame:
-    query = """
-        SELECT
-            DATE_TRUNC('week', date) AS week_start_date,
-            SUM(swap_revenue) AS value
-        FROM daily_stats
-        GROUP BY week_start_date
-        ORDER BY week_start_date
+def fetch_weekly_stats(metric=None, start=None, end=None) -> pd.DataFrame:
     """
-    with conn.cursor() as cur:
-        cur.execute(query)
-        rows = cur.fetchall()
-        return pd.DataFrame([
-            {
-                "week_start_date": row[0],
-                "metric": "swap_revenue",
-                "value": float(row[1] or 0),
-                "quantity": 0,
-            }
-            for row in rows
-        ])
-
-def fetch_weekly_avg_revenue_metrics(start):
+    weekly_stats rows for one metric (str) or several (list), with weeks in [start, end].
     """
-    Aggregates revenue and active user metrics from `avg_revenue_metrics` table
-    for the full week starting on `start` (a Monday).
-    Returns a single-row DataFrame for upsert.
+    query = """
+        SELECT week_start_date AS week, metric, value, quantity
+        FROM weekly_stats
+        WHERE 1=1
     """
-    if isinstance(start, pd.Timestamp):
-        start = start.to_pydatetime().date()
-
-    if hasattr(start, "date"):  # In case it's accidentally a datetime
-        start = start.date()
-
-    end = start + timedelta(days=7)
+    params = []
+    if metric:
+        query += " AND metric = ANY(%s)"
+        params.append([metric] if isinstance(metric, str) else list(metric))
+    if start:
+        query += " AND week_start_date >= %s"
+        params.append(start)
+    if end:
+        query += " AND week_start_date <= %s"
+        params.append(end)
+    query += " ORDER BY week"
 
     with get_cache_db_connection() as conn:
-        df = pd.read_sql("""
-            SELECT date, total_fees, active_users
-            FROM avg_revenue_metrics
-            WHERE date >= %s AND date < %s
-        """, conn, params=(start, end))
+        df = pd.read_sql(query, conn, params=tuple(params))
+    return df
 
-    if df.empty:
-        return pd.DataFrame()
 
-    total_fees = df["total_fees"].sum()
-    total_active_users = df["active_users"].sum()
-    avg_rev_per_active_user = total_fees / total_active_users if total_active_users else 0
+def fetch_first_week(metrics=None):
+    query = "SELECT MIN(week_start_date) FROM weekly_stats"
+    params = []
+    if metrics:
+        query += " WHERE metric = ANY(%s)"
+        params.append(list(metrics))
 
-    return pd.DataFrame([{
-        "week": start,
-        "total_fees": total_fees,
-        "active_users": total_active_users,
-        "avg_rev_per_active_user": avg_rev_per_active_user
-    }])
\ No newline at end of file
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, tuple(params))
+            return cur.fetchone()[0]
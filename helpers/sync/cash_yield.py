@@ -0,0 +1,23 @@
+import os
+import requests
+from helpers.connection import get_cache_db_connection
+from helpers.upsert.cash_yield import upsert_cash_yield_history
+from helpers.utils.env_utils import get_env_or_secret
+
+YIELD_API_URL = os.getenv("CASH_YIELD_API_URL") or get_env_or_secret("yield_api_url", section="cash")
+
+
+def sync_cash_yield():
+    """
+    Downloads the yield API payload once and stores it, so readers never call the API.
+    """
+    if not YIELD_API_URL:
+        print("⚠️ No cash yield API URL configured. Skipping.")
+        return
+
+    print("🔁 Syncing cash yield history")
+    response = requests.get(YIELD_API_URL, timeout=30)
+    response.raise_for_status()
+
+    with get_cache_db_connection() as conn:
+        upsert_cash_yield_history(response.json(), conn)
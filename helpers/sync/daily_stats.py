@@ -1,11 +1,37 @@
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from helpers.upsert.daily_stats import upsert_daily_stats
 from helpers.upsert.daily_user_stats import upsert_daily_user_stats
+from helpers.upsert.user_bitmaps import upsert_daily_user_bitmaps
+from helpers.upsert.user_sketches import upsert_daily_user_sketches
 from helpers.connection import get_cache_db_connection
 from helpers.utils.sync_state import get_last_sync, update_last_sync
 
 SECTION_KEY = "Daily_Stats"
 
+# Shared with the intraday refresh so the two never rewrite today's rows concurrently
+DAILY_STATS_LOCK_ID = 742001
+
+
+@contextmanager
+def daily_stats_lock(conn):
+    """
+    Session-level lock, since the work inside commits several times.
+    On failure the aborted transaction is rolled back first so the unlock can run
+    and the original error is the one that propagates.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (DAILY_STATS_LOCK_ID,))
+    try:
+        yield
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (DAILY_STATS_LOCK_ID,))
+        conn.commit()
+
 def sync_daily_stats() -> None:
     now = datetime.now(timezone.utc)
 
@@ -21,8 +47,10 @@ def sync_daily_stats() -> None:
     print(f"🔁 Starting sync for daily stats from {start.isoformat()}")
 
     try:
-        with get_cache_db_connection() as conn:
+        with get_cache_db_connection() as conn, daily_stats_lock(conn):
             upsert_daily_stats(start=start, conn=conn)
+            upsert_daily_user_bitmaps(start=start, conn=conn)
+            upsert_daily_user_sketches(start=start, conn=conn)
             upsert_daily_user_stats(start=start, conn=conn)
         update_last_sync(SECTION_KEY, now)
         print(f"✅ Daily stats synced successfully. Last sync updated to {now.isoformat()}")
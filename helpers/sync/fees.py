@@ -1,5 +1,8 @@
 from datetime import datetime, timezone
+from helpers.connection import get_cache_db_connection
 from helpers.fetch.fee_data import fetch_fee_series
+from helpers.upsert.fee_rollup import FEE_ROLLUP_DDL, rebuild_fee_rollup
+from helpers.upsert.revenue_cube import refresh_revenue_cube
 from helpers.utils.sync_state import get_last_sync, update_last_sync
 
 SECTION_KEY = "Fee_Series"
@@ -11,6 +14,18 @@ def sync_fee_series():
     print(f"🔁 Running sync_fee_series from {start.date()} to {now.date()}")
 
     try:
+        # Ingestion keeps fee_rollup current; rebuilding here would race it, so only seed an empty table
+        with get_cache_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(FEE_ROLLUP_DDL)
+                cur.execute("SELECT 1 FROM fee_rollup LIMIT 1")
+                seeded = cur.fetchone() is not None
+            if not seeded:
+                print("🧱 fee_rollup is empty, seeding it from transactions_cache")
+                rebuild_fee_rollup(conn)
+            refresh_revenue_cube(conn, start.date())
+            conn.commit()
+
         df = fetch_fee_series(start=start)
 
         if df.empty or "date" not in df.columns:
@@ -19,7 +34,6 @@ def sync_fee_series():
             return
 
         print(f"📊 Found {len(df)} fee records (from {df['date'].min()} to {df['date'].max()})")
-        # No upsert step — display summary only
         print(df.head())
 
         update_last_sync(SECTION_KEY, now)
@@ -1,9 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 import pandas as pd
 
-from helpers.fetch.financials import fetch_avg_revenue_metrics, fetch_avg_revenue_metrics_for_range
+from helpers.connection import get_cache_db_connection
+from helpers.fetch.financials import fetch_avg_revenue_metrics_history, fetch_weekly_revenue_metrics
 from helpers.fetch.fee_data import fetch_fee_series
-from helpers.upsert.avg_revenue import upsert_weekly_avg_revenue_metrics
+from helpers.upsert.avg_revenue import upsert_avg_revenue_metrics, upsert_weekly_avg_revenue_metrics
+from helpers.utils.sync_state import get_last_sync, update_last_sync
+
+AVG_REVENUE_SECTION_KEY = "Avg_Revenue_Metrics"
 
 
 def sync_financials(last_sync: datetime, now: datetime):
@@ -22,22 +26,45 @@ def sync_financials(last_sync: datetime, now: datetime):
     else:
         print("⚠️ No new fee data found.")
 
-    # === 2. Daily Revenue Snapshot (rolling 30d)
-    fetch_avg_revenue_metrics(days=30)
-    print("✅ Daily average revenue metrics fetched")
-
-    # === 3. Weekly Revenue Metrics
-    start_date = last_sync.date()
-    end_date = now.date()
-    start_of_week = start_date - timedelta(days=start_date.weekday())  # align to Monday
+    # === 2. Daily Revenue Snapshots (rolling 30d) for every day in range
+    upsert_avg_revenue_metrics(fetch_avg_revenue_metrics_history(last_sync.date(), now.date()))
+    print("✅ Daily average revenue metrics backfilled")
 
-    while start_of_week <= end_date:
-        weekly_df = fetch_avg_revenue_metrics_for_range(start_date=start_of_week, days=7)
-        if not weekly_df.empty:
-            upsert_weekly_avg_revenue_metrics(weekly_df)
-            print(f"📅 Weekly revenue upserted for week starting {start_of_week}")
-        else:
-            print(f"⚠️ No revenue data found for week of {start_of_week}")
-        start_of_week += timedelta(days=7)
+    # === 3. Weekly Revenue Metrics (same per-week builder cron uses for weekly_avg_revenue_metrics)
+    weekly_df = fetch_weekly_revenue_metrics(last_sync.date(), now.date())
+    if not weekly_df.empty:
+        upsert_weekly_avg_revenue_metrics(weekly_df)
+        print(f"📅 Weekly revenue upserted for {len(weekly_df)} week(s) starting {weekly_df['week'].min()}")
+    else:
+        print(f"⚠️ No revenue data found between {last_sync.date()} and {now.date()}")
 
     print(f"🎉 Financials sync complete → {last_sync.date()} to {now.date()}")
+
+
+def sync_avg_revenue_metrics():
+    """
+    Keeps avg_revenue_metrics filled for every day, so the Financials page only reads it.
+    The first run backfills from the earliest fee rollup day.
+    """
+    now = datetime.now(timezone.utc)
+
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM avg_revenue_metrics LIMIT 1")
+            has_history = cur.fetchone() is not None
+            cur.execute("SELECT MIN(date) FROM fee_rollup")
+            first_day = cur.fetchone()[0]
+
+    if not first_day:
+        print("⚠️ No fee rollup data yet. Skipping avg revenue metrics.")
+        return
+
+    # Re-process the last synced day since it may have been partial
+    start = get_last_sync(AVG_REVENUE_SECTION_KEY).date() if has_history else first_day
+    start = max(start, first_day)
+
+    print(f"🔁 Syncing avg revenue metrics from {start} to {now.date()}")
+    upsert_avg_revenue_metrics(fetch_avg_revenue_metrics_history(start, now.date()))
+
+    update_last_sync(AVG_REVENUE_SECTION_KEY, now)
+    print(f"✅ Avg revenue metrics synced. Last sync updated to {now.isoformat()}")
@@ -0,0 +1,45 @@
+from datetime import datetime, time, timezone, timedelta
+from helpers.connection import get_cache_db_connection
+from helpers.sync.daily_stats import daily_stats_lock
+from helpers.upsert.daily_stats import upsert_daily_stats
+from helpers.upsert.daily_user_stats import upsert_daily_user_stats
+from helpers.upsert.intraday_stats import upsert_intraday_stats
+from helpers.upsert.user_bitmaps import upsert_daily_user_bitmaps
+from helpers.upsert.user_sketches import upsert_daily_user_sketches
+from helpers.utils.sync_state import get_last_sync, update_last_sync
+
+SECTION_KEY = "Intraday_Stats"
+
+# Re-read a little before the watermark to catch ingestion transactions that committed late;
+# rows already in the journal are no-ops
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def sync_intraday_stats():
+    """
+    Keeps today's daily stats fresh between nightly runs.
+    The first run of a day recomputes today in full; later runs only apply newly ingested rows.
+    """
+    now = datetime.now(timezone.utc)
+    today = now.date()
+
+    last_sync = get_last_sync(SECTION_KEY)
+    if last_sync.tzinfo is None:
+        last_sync = last_sync.replace(tzinfo=timezone.utc)
+
+    try:
+        with get_cache_db_connection() as conn, daily_stats_lock(conn):
+            if last_sync.date() < today:
+                day_start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+                print(f"🔁 First intraday run for {today}, recomputing today's stats in full")
+                upsert_daily_stats(start=day_start, conn=conn)
+                upsert_daily_user_bitmaps(start=day_start, conn=conn)
+                upsert_daily_user_sketches(start=day_start, conn=conn)
+                upsert_daily_user_stats(start=day_start, conn=conn)
+            else:
+                print(f"🔁 Applying transactions ingested since {last_sync.isoformat()}")
+                upsert_intraday_stats(since=last_sync - WATERMARK_OVERLAP, day=today, conn=conn)
+        update_last_sync(SECTION_KEY, now)
+        print(f"✅ Intraday stats synced. Last sync updated to {now.isoformat()}")
+    except Exception as e:
+        print(f"❌ Failed to sync intraday stats: {e}")
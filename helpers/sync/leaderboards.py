@@ -0,0 +1,14 @@
+from helpers.connection import get_cache_db_connection
+from helpers.upsert.leaderboard_snapshots import refresh_leaderboard_snapshots
+from helpers.utils.sync_state import get_last_sync
+
+
+def sync_leaderboard_snapshots():
+    """
+    Precomputes the preset-window leaderboards. Runs after the transaction cache
+    and referrals syncs so the snapshots reflect their latest data.
+    """
+    watermark = get_last_sync("Transactions")
+    print(f"🔁 Refreshing leaderboard snapshots (transactions as of {watermark.isoformat()})")
+    with get_cache_db_connection() as conn:
+        refresh_leaderboard_snapshots(conn, watermark=watermark)
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+from helpers.connection import get_cache_db_connection, get_main_db_connection
+from helpers.upsert.referrals import REFERRALS_DDL, upsert_referrals
+from helpers.utils.sync_state import get_last_sync, update_last_sync
+
+SECTION_KEY = "Referrals"
+FULL_COPY_SECTION_KEY = "Referrals_Full"
+
+# Re-read recent signups in case their referrer was attached shortly after creation
+RECOUNT_DAYS = 2
+
+# Usernames can be set or changed long after signup; re-copy every edge this often
+FULL_COPY_INTERVAL = timedelta(days=1)
+
+
+def sync_referrals():
+    """
+    Keeps the cache DB's referrals table in step with the main DB.
+    Runs between full copies only look at recent signups; a full copy runs at
+    least every FULL_COPY_INTERVAL and drops edges that no longer exist upstream.
+    """
+    now = datetime.now(timezone.utc)
+
+    with get_cache_db_connection() as cache_conn, get_main_db_connection() as main_conn:
+        with cache_conn.cursor() as cur:
+            cur.execute(REFERRALS_DDL)
+            cur.execute("SELECT 1 FROM referrals LIMIT 1")
+            has_edges = cur.fetchone() is not None
+
+        last_full_copy = get_last_sync(FULL_COPY_SECTION_KEY).replace(tzinfo=timezone.utc)
+        full_copy = not has_edges or now - last_full_copy >= FULL_COPY_INTERVAL
+        since = None if full_copy else get_last_sync(SECTION_KEY) - timedelta(days=RECOUNT_DAYS)
+        print(f"🔁 Syncing referrals{f' for users created since {since.isoformat()}' if since else ' (full copy)'}")
+        upsert_referrals(since, main_conn, cache_conn, now)
+
+    update_last_sync(SECTION_KEY, now)
+    if full_copy:
+        update_last_sync(FULL_COPY_SECTION_KEY, now)
+    print(f"✅ Referrals synced. Last sync updated to {now.isoformat()}")
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone, timedelta
+from helpers.connection import get_cache_db_connection
+from helpers.upsert.user_bitmaps import DAILY_USER_BITMAPS_DDL
+from helpers.upsert.user_cohorts import (
+    upsert_user_cohorts,
+    ROLLING_ACTIVE_USERS_DDL,
+    ROLLING_DAU_ALL_TYPES_DDL,
+)
+from helpers.utils.sync_state import get_last_sync, update_last_sync
+
+SECTION_KEY = "User_Cohorts"
+
+
+def sync_user_cohorts():
+    """
+    Advances rolling actives (through yesterday) and cohort retention (through today)
+    from the last synced day.
+    Runs after the daily stats sync so today's activity bitmaps are already stored.
+    """
+    now = datetime.now(timezone.utc)
+    end = now.date() + timedelta(days=1)
+
+    with get_cache_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(DAILY_USER_BITMAPS_DDL)
+            cur.execute(ROLLING_ACTIVE_USERS_DDL)
+            cur.execute(ROLLING_DAU_ALL_TYPES_DDL)
+            cur.execute("SELECT 1 FROM rolling_active_users LIMIT 1")
+            has_history = cur.fetchone() is not None
+            cur.execute("SELECT MIN(date) FROM rolling_active_users WHERE dau_all_types IS NULL")
+            first_missing = cur.fetchone()[0]
+            cur.execute("""
+                SELECT MIN(date) FROM daily_user_bitmaps WHERE dimension = 'type'
+            """)
+            first_activity = cur.fetchone()[0]
+
+        if not first_activity:
+            print("⚠️ No activity bitmaps found. Run the daily stats sync first.")
+            return
+
+        # Re-process the last synced day since it may have been partial
+        start = get_last_sync(SECTION_KEY).date() if has_history else first_activity
+        if first_missing:
+            # Rows written before dau_all_types existed are recomputed once
+            start = min(start, first_missing)
+        start = max(start, first_activity)
+
+        print(f"🔁 Syncing user cohorts from {start} to {now.date()}")
+        upsert_user_cohorts(start, end, conn)
+
+    update_last_sync(SECTION_KEY, now)
+    print(f"✅ User cohorts synced. Last sync updated to {now.isoformat()}")
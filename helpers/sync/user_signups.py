@@ -0,0 +1,42 @@
+from datetime import datetime, timezone, timedelta
+from helpers.connection import get_cache_db_connection, get_main_db_connection
+from helpers.upsert.user_cohorts import upsert_signup_bitmaps
+from helpers.upsert.user_signups import upsert_recent_users, upsert_user_signups_daily, upsert_user_totals
+from helpers.utils.sync_state import get_last_sync, update_last_sync
+
+SECTION_KEY = "User_Signups"
+
+# upsert_users rewrites the last two days of users, so recount at least that far back
+RECOUNT_DAYS = 2
+
+
+def sync_user_signups():
+    """
+    Refreshes daily signup counts and signup bitmaps from the cached `users` table,
+    and the total user count and recent users from the main DB.
+    Runs after the users table sync and before daily stats, which read both.
+    """
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    start = min(get_last_sync(SECTION_KEY).date(), today - timedelta(days=RECOUNT_DAYS))
+
+    print(f"🔁 Syncing user signups from {start} to {today}")
+    with get_cache_db_connection() as conn, get_main_db_connection() as main_conn:
+        upsert_user_signups_daily(start, conn, end=today)
+        upsert_signup_bitmaps(start, today + timedelta(days=1), conn)
+        upsert_user_totals(main_conn, conn, now)
+        upsert_recent_users(main_conn, conn, now)
+        conn.commit()
+
+    update_last_sync(SECTION_KEY, now)
+    print(f"✅ User signups synced. Last sync updated to {now.isoformat()}")
+
+
+def sync_recent_users():
+    """
+    Keeps recent_users (users created since the last total snapshot) fresh between
+    nightly runs, so Home's user counts stay current from the cache DB alone.
+    """
+    now = datetime.now(timezone.utc)
+    with get_cache_db_connection() as conn, get_main_db_connection() as main_conn:
+        upsert_recent_users(main_conn, conn, now)
@@ -0,0 +1,13 @@
+from helpers.connection import get_cache_db_connection, get_main_db_connection
+from helpers.fetch.wallet_addresses import clear_wallet_owner_cache
+from helpers.upsert.wallet_addresses import upsert_wallet_addresses
+
+
+def sync_wallet_addresses():
+    """
+    Mirrors wallet and email ownership into the cache DB for transaction search.
+    """
+    print("🔁 Syncing wallet addresses and emails")
+    with get_cache_db_connection() as cache_conn, get_main_db_connection() as main_conn:
+        upsert_wallet_addresses(main_conn, cache_conn)
+    clear_wallet_owner_cache()
@@ -1,15 +1,23 @@
 # helpers/sync/weekly_data.py
 
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 
 from helpers.api_utils import fetch_api_metric
-from helpers.fetch.weekly_data import fetch_swap_series, fetch_weekly_avg_revenue_metrics
+from helpers.connection import get_cache_db_connection
+from helpers.fetch.weekly_data import fetch_swap_series
+from helpers.fetch.financials import fetch_weekly_revenue_metrics
 from helpers.upsert.avg_revenue import upsert_weekly_avg_revenue_metrics
+from helpers.utils.calendar import week_start, week_starts
 from helpers.utils.sync_state import get_last_sync, update_last_sync
-from helpers.upsert.weekly_stats import upsert_weekly_api_metrics
+from helpers.upsert.weekly_stats import upsert_weekly_api_metrics, upsert_weekly_swap_revenue
 
 SECTION_KEY = "Weekly_Data"
+WEEKLY_SWAP_SECTION_KEY = "Weekly_Swap_Stats"
+WEEKLY_AVG_REVENUE_SECTION_KEY = "Weekly_Avg_Revenue"
+
+# Re-check daily_stats rows updated a little before the watermark in case their write committed late
+WATERMARK_OVERLAP = timedelta(minutes=5)
 
 API_ENDPOINTS = {
     "cash_volume": "user/cash/volume",
@@ -62,7 +70,7 @@ def sync_weekly_data():
     # === Aggregate and upsert API metrics weekly ===
     if all_api_metric_rows:
         api_df = pd.concat(all_api_metric_rows, ignore_index=True)
-        api_df["week_start_date"] = pd.to_datetime(api_df["date"]).dt.to_period("W").apply(lambda r: r.start_time)
+        api_df["week_start_date"] = week_starts(api_df["date"])
         weekly_api = api_df.groupby(["week_start_date", "metric"], as_index=False)["value"].sum()
         weekly_api["quantity"] = 0
 
@@ -74,42 +82,34 @@ def sync_weekly_data():
     update_last_sync(SECTION_KEY, now)
     print(f"✅ Weekly data sync complete. Last sync updated to {now.isoformat()}")
 
-def sync_weekly_avg_revenue_metrics():
+def sync_weekly_swap_stats():
     """
-    Syncs weekly average revenue metrics from the last sync date up to the current week.
+    Refreshes the daily_stats-derived weekly_stats rows for weeks whose days changed since the last run.
     """
-    now = datetime.utcnow()
-    last_sync = get_last_sync(SECTION_KEY)
+    now = datetime.now(timezone.utc)
+    last_sync = get_last_sync(WEEKLY_SWAP_SECTION_KEY)
+    if last_sync.tzinfo is None:
+        last_sync = last_sync.replace(tzinfo=timezone.utc)
 
-    if not last_sync:
-        print("⚠️ No previous sync found for Weekly_Data. Defaulting to 2024-01-01.")
-        last_sync = datetime(2024, 1, 1)
+    print(f"🔁 Syncing weekly swap stats for daily_stats rows updated since {last_sync.isoformat()}")
+    with get_cache_db_connection() as conn:
+        upsert_weekly_swap_revenue(conn, since=last_sync - WATERMARK_OVERLAP)
 
-    if isinstance(last_sync, datetime):
-        start_date = last_sync.date()
-    elif isinstance(last_sync, pd.Timestamp):
-        start_date = last_sync.to_pydatetime().date()
-    else:
-        start_date = last_sync  # assume it's already a datetime.date
+    update_last_sync(WEEKLY_SWAP_SECTION_KEY, now)
+    print(f"✅ Weekly swap stats synced. Last sync updated to {now.isoformat()}")
 
-    today = now.date()
-    start_of_week = start_date - timedelta(days=start_date.weekday())  # align to Monday
-    current_week = today - timedelta(days=today.weekday())
 
-    print(f"🔁 Syncing weekly average revenue metrics from {start_of_week} to {current_week}")
+def sync_weekly_avg_revenue_metrics():
+    """
+    Syncs weekly average revenue metrics from the week of the last sync up to the current week.
+    """
+    now = datetime.now(timezone.utc)
+    start_date = get_last_sync(WEEKLY_AVG_REVENUE_SECTION_KEY).date()
+    start_of_week = week_start(start_date)
 
-    while start_of_week <= current_week:
-        try:
-            print(f"📅 Processing week: {start_of_week}")
-            df = fetch_weekly_avg_revenue_metrics(start_of_week)
-            if df is not None and not df.empty:
-                print(f"📊 Upserting {len(df)} rows for week: {start_of_week}")
-                upsert_weekly_avg_revenue_metrics(df)
-            else:
-                print(f"⚠️ No data returned for week: {start_of_week}")
-        except Exception as e:
-            print(f"❌ Error processing week {start_of_week}: {e}")
-        start_of_week += timedelta(days=7)
+    print(f"🔁 Syncing weekly average revenue metrics from {start_of_week}")
+    # Built from per-week fees and distinct users; avg_revenue_metrics rows are trailing 30-day windows
+    upsert_weekly_avg_revenue_metrics(fetch_weekly_revenue_metrics(start_of_week, now.date()))
 
-    update_last_sync(SECTION_KEY, now)
-    print(f"✅ Weekly average revenue metrics sync complete. Last sync updated to {now.isoformat()}")
\ No newline at end of file
+    update_last_sync(WEEKLY_AVG_REVENUE_SECTION_KEY, now)
+    print(f"✅ Weekly average revenue metrics sync complete. Last sync updated to {now.isoformat()}")
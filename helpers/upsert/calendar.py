@@ -0,0 +1,45 @@
+from helpers.utils.calendar import CALENDAR_END, CALENDAR_START
+
+# Date dimension for SQL bucketing; helpers.utils.calendar is the in-process equivalent
+CALENDAR_DDL = """
+    CREATE TABLE IF NOT EXISTS calendar (
+        date DATE PRIMARY KEY,
+        week_start DATE NOT NULL,
+        month_start DATE NOT NULL,
+        iso_year INTEGER NOT NULL,
+        iso_week INTEGER NOT NULL,
+        day_of_week INTEGER NOT NULL,
+        is_complete_week BOOLEAN NOT NULL DEFAULT FALSE
+    )
+"""
+
+
+def ensure_calendar(conn):
+    """
+    Seeds the calendar table on first use and refreshes `is_complete_week`,
+    the only column that changes with the current date.
+    """
+    with conn.cursor() as cur:
+        cur.execute(CALENDAR_DDL)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_calendar_week_start ON calendar (week_start)")
+        cur.execute("""
+            INSERT INTO calendar (date, week_start, month_start, iso_year, iso_week, day_of_week)
+            SELECT d::date,
+                   DATE_TRUNC('week', d)::date,
+                   DATE_TRUNC('month', d)::date,
+                   EXTRACT(ISOYEAR FROM d)::int,
+                   EXTRACT(WEEK FROM d)::int,
+                   EXTRACT(ISODOW FROM d)::int
+            FROM generate_series(%s::date, %s::date - 1, INTERVAL '1 day') AS d
+            ON CONFLICT (date) DO NOTHING
+        """, (CALENDAR_START, CALENDAR_END))
+        seeded = cur.rowcount
+        cur.execute("""
+            UPDATE calendar SET is_complete_week = (week_start + 7 <= CURRENT_DATE)
+            WHERE is_complete_week IS DISTINCT FROM (week_start + 7 <= CURRENT_DATE)
+        """)
+    conn.commit()
+
+    if seeded:
+        print(f"🧱 Seeded calendar with {seeded} day(s).")
+    print("✅ Calendar up to date.")
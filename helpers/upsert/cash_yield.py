@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+import pandas as pd
+from psycopg2.extras import execute_values
+
+# Every balance point the yield API has reported, per asset
+CASH_YIELD_HISTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS cash_yield_history (
+        asset_id TEXT NOT NULL,
+        ts TIMESTAMPTZ NOT NULL,
+        balance NUMERIC NOT NULL,
+        original_balance NUMERIC NOT NULL,
+        PRIMARY KEY (asset_id, ts)
+    )
+"""
+
+# Latest balances per asset (the API's `fullassets`), used for lifetime yield
+CASH_YIELD_ASSETS_DDL = """
+    CREATE TABLE IF NOT EXISTS cash_yield_assets (
+        asset_id TEXT PRIMARY KEY,
+        balance NUMERIC NOT NULL,
+        original_balance NUMERIC NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+def _to_timestamp(value) -> datetime:
+    if isinstance(value, (int, float)):
+        # Epoch seconds or milliseconds
+        return datetime.fromtimestamp(value / 1000 if value > 1e12 else value, tz=timezone.utc)
+    return pd.to_datetime(value, utc=True).to_pydatetime()
+
+
+def upsert_cash_yield_history(data: dict, conn):
+    """
+    Stores a yield API payload: `assethistory` points into cash_yield_history
+    and `fullassets` balances into cash_yield_assets. Assets missing from a
+    non-empty `fullassets` are dropped so lifetime yield only counts live ones.
+    """
+    # Keyed on (asset_id, ts): one batch may not touch the same row twice under ON CONFLICT
+    points = {}
+    for asset_id, entries in (data.get("assethistory") or {}).items():
+        for entry in entries:
+            if len(entry) >= 3:
+                points[(str(asset_id), _to_timestamp(entry[0]))] = (float(entry[1]), float(entry[2]))
+    history = [(asset_id, ts, balance, original) for (asset_id, ts), (balance, original) in points.items()]
+    assets = [
+        (str(asset_id), float(asset.get("balance", 0)), float(asset.get("original_balance", 0)))
+        for asset_id, asset in (data.get("fullassets") or {}).items()
+    ]
+
+    removed = 0
+    with conn.cursor() as cur:
+        cur.execute(CASH_YIELD_HISTORY_DDL)
+        cur.execute(CASH_YIELD_ASSETS_DDL)
+        if history:
+            execute_values(cur, """
+                INSERT INTO cash_yield_history (asset_id, ts, balance, original_balance)
+                VALUES %s
+                ON CONFLICT (asset_id, ts) DO UPDATE SET
+                    balance = EXCLUDED.balance,
+                    original_balance = EXCLUDED.original_balance
+            """, history)
+        if assets:
+            execute_values(cur, """
+                INSERT INTO cash_yield_assets (asset_id, balance, original_balance)
+                VALUES %s
+                ON CONFLICT (asset_id) DO UPDATE SET
+                    balance = EXCLUDED.balance,
+                    original_balance = EXCLUDED.original_balance,
+                    updated_at = now()
+            """, assets)
+            # Every asset in this payload was just stamped with the transaction's now()
+            cur.execute("DELETE FROM cash_yield_assets WHERE updated_at < now()")
+            removed = cur.rowcount
+    conn.commit()
+
+    print(
+        f"✅ Stored {len(history)} cash yield history point(s) for {len(assets)} asset(s)"
+        f"{f', removed {removed} stale asset(s)' if removed else ''}."
+    )
@@ -2,35 +2,59 @@ from datetime import datetime, timedelta
 import pandas as pd
 from psycopg2.extras import execute_values
 from helpers.api_utils import fetch_api_metric
-from helpers.fetch.user import fetch_all_users
+from helpers.upsert.intraday_stats import reset_intraday_journal
+
+
+def ensure_updated_at_column(conn):
+    """
+    Adds the `updated_at` marker weekly rollups use to find the days (and so weeks)
+    that changed since their last run.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            ALTER TABLE daily_stats
+            ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_daily_stats_updated_at
+            ON daily_stats (updated_at)
+        """)
+    conn.commit()
+
 
 def upsert_daily_stats(start: datetime, end: datetime = None, conn=None):
     start_date = start.date()
     end_date = (end or datetime.now()).date() + timedelta(days=1)
 
-    # === Load user data for new users and new active users ===
-    all_users_df = fetch_all_users()
-    if "created_at" in all_users_df.columns:
-        all_users_df["created_at"] = pd.to_datetime(all_users_df["created_at"], errors="coerce").dt.date
-    user_creation_map = dict(zip(all_users_df["user_id"], all_users_df["created_at"]))
+    ensure_updated_at_column(conn)
 
     # === Load raw transactions ===
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT DATE(created_at), from_chain, type, amount_usd, fee_usd, from_user
+            SELECT DATE(created_at), from_chain, type, amount_usd, fee_usd, from_user, tx_hash
             FROM transactions_cache
             WHERE created_at >= %s AND created_at < %s AND status = 'SUCCESS'
         """, (start_date, end_date))
         rows = cur.fetchall()
 
     df = pd.DataFrame(rows, columns=[
-        "date", "chain_name", "type", "amount_usd", "fee_usd", "from_user"
+        "date", "chain_name", "type", "amount_usd", "fee_usd", "from_user", "tx_hash"
     ])
 
     if df.empty:
         print("✅ No transaction data to process for daily_stats.")
         return
 
+    # === Signup dates for just the users active in range (for new / new active users) ===
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT username, MIN(created_at)::date
+            FROM users
+            WHERE username = ANY(%s)
+            GROUP BY username
+        """, (list(df["from_user"].dropna().unique()),))
+        user_creation_map = dict(cur.fetchall())
+
     stats = []
     grouped = df.groupby(["date", "chain_name"])
 
@@ -102,7 +126,8 @@ def upsert_daily_stats(start: datetime, end: datetime = None, conn=None):
                 active_users = EXCLUDED.active_users,
                 new_users = EXCLUDED.new_users,
                 new_active_users = EXCLUDED.new_active_users,
-                revenue = EXCLUDED.revenue
+                revenue = EXCLUDED.revenue,
+                updated_at = now()
         """, [
             (
                 r["date"], r["chain_name"],
@@ -116,4 +141,16 @@ def upsert_daily_stats(start: datetime, end: datetime = None, conn=None):
         ])
         conn.commit()
 
-    print(f"✅ Upserted {len(stats)} rows into daily_stats.")
\ No newline at end of file
+    print(f"✅ Upserted {len(stats)} rows into daily_stats.")
+
+    # === Today's rows are now counted: hand them to the intraday refresh as its baseline ===
+    today = datetime.utcnow().date()
+    if start_date <= today < end_date:
+        today_df = df[df["date"] == today]
+        reset_intraday_journal(conn, today, [
+            (
+                r.tx_hash, r.date, r.chain_name, r.type, r.from_user,
+                float(r.amount_usd or 0), float(r.fee_usd or 0)
+            )
+            for r in today_df.itertuples(index=False)
+        ])
@@ -1,85 +1,47 @@
-from collections import defaultdict
 from datetime import datetime, timedelta
 from psycopg2.extras import execute_values
 
-from helpers.connection import get_main_db_connection
+from helpers.fetch.user_bitmaps import fetch_cumulative_bitmap, fetch_user_bitmaps
+from helpers.fetch.user_signups import fetch_signup_counts
+from helpers.upsert.user_bitmaps import ACTIVE_TYPES
+from helpers.utils import bitmaps
 
 def upsert_daily_user_stats(start: datetime, conn):
     start_date = start.date()
     end_date = datetime.utcnow().date() + timedelta(days=1)
 
-    # === Load all known users (username + createdAt) ===
-    with get_main_db_connection() as main_conn:
-        with main_conn.cursor() as cur:
-            cur.execute('SELECT "userId", username, "createdAt" FROM "User"')
-            all_users = cur.fetchall()
+    # === Signup counts, maintained by the user signups sync ===
+    new_users_by_day = fetch_signup_counts(conn, start_date, end_date)
 
-    user_created_map = {
-        user_id: created.date()
-        for user_id, username, created in all_users if username
-    }
-    username_to_userId = {
-        username.lower(): user_id
-        for user_id, username, _ in all_users if username
-    }
+    # === Users active on any day before the range ===
+    # Every sender counts, including users who signed up after the last users sync;
+    # upsert_intraday_user_stats uses the same definition for today
+    _, past_active = fetch_cumulative_bitmap(conn, start_date, label="active")
 
-    # === Load all previously active users before this date ===
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT DISTINCT from_user
-            FROM transactions_cache
-            WHERE status = 'SUCCESS'
-              AND type IN ('SWAP', 'SEND', 'CASH')
-              AND created_at < %s
-        """, (start_date,))
-        past_active_usernames = {r[0].lower() for r in cur.fetchall() if r[0]}
-        past_active_userIds = {
-            username_to_userId[u] for u in past_active_usernames if u in username_to_userId
-        }
-
-    # === Load transaction activity during the target range ===
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT DATE(created_at), type, from_user
-            FROM transactions_cache
-            WHERE status = 'SUCCESS'
-              AND type IN ('SWAP', 'SEND', 'CASH')
-              AND created_at >= %s AND created_at < %s
-        """, (start_date, end_date))
-        rows = cur.fetchall()
-
-    # === Aggregate user activity by type and day ===
-    daily_users = defaultdict(lambda: {"swap": set(), "send": set(), "cash": set()})
-
-    for txn_date, typ, from_user in rows:
-        if not from_user:
-            continue
-        user_id = username_to_userId.get(from_user.lower())
-        if not user_id:
-            continue
-        daily_users[txn_date][typ.lower()].add(user_id)
+    # === Per-day, per-type activity bitmaps for the target range ===
+    daily = fetch_user_bitmaps(conn, start_date, end_date, dimension="type", labels=ACTIVE_TYPES)
+    empty = bitmaps.decode(None)
 
     # === Build upsert rows ===
     rows_to_upsert = []
-    for day in sorted(daily_users.keys()):
-        swap_users = daily_users[day]["swap"]
-        send_users = daily_users[day]["send"]
-        cash_users = daily_users[day]["cash"]
+    for day in sorted({d for d, _ in daily}):
+        swap_users = daily.get((day, "SWAP"), empty)
+        send_users = daily.get((day, "SEND"), empty)
+        cash_users = daily.get((day, "CASH"), empty)
 
-        active_user_ids = swap_users | send_users | cash_users
-        new_active_users = active_user_ids - past_active_userIds
-        new_users = {uid for uid, created in user_created_map.items() if created == day}
+        active_users = bitmaps.union(swap_users, send_users, cash_users)
+        new_active_users = bitmaps.difference(active_users, past_active)
 
-        past_active_userIds.update(active_user_ids)
+        past_active = bitmaps.union(past_active, active_users)
 
         rows_to_upsert.append((
             day,
-            len(swap_users),
-            len(send_users),
-            len(cash_users),
-            len(active_user_ids),
-            len(new_users),
-            len(new_active_users),
+            bitmaps.cardinality(swap_users),
+            bitmaps.cardinality(send_users),
+            bitmaps.cardinality(cash_users),
+            bitmaps.cardinality(active_users),
+            new_users_by_day.get(day, 0),
+            bitmaps.cardinality(new_active_users),
         ))
 
     if not rows_to_upsert:
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from psycopg2.extras import execute_values
+
+from helpers.utils.safe_math import safe_float
+
+# Fees and counts of successful transactions per (day, chain, type), kept in step with ingestion
+FEE_ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS fee_rollup (
+        date DATE NOT NULL,
+        chain TEXT NOT NULL,
+        type TEXT NOT NULL,
+        fee_usd NUMERIC NOT NULL DEFAULT 0,
+        tx_count BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (date, chain, type)
+    )
+"""
+
+
+def _day(ts: datetime) -> date:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+def rebuild_fee_rollup(conn, start: date = None):
+    """
+    Recomputes fee_rollup from transactions_cache for days >= start (everything if None).
+    Used to seed an empty table and as a manual repair path; it deletes and
+    reinserts the range, so do not run it alongside ingestion.
+    The caller is responsible for committing.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FEE_ROLLUP_DDL)
+        query = """
+            SELECT DATE(created_at AT TIME ZONE 'UTC'), COALESCE(from_chain, 'unknown'), type,
+                   COALESCE(SUM(fee_usd), 0), COUNT(*)
+            FROM transactions_cache
+            WHERE status = 'SUCCESS'
+        """
+        params = []
+        if start:
+            # UTC days, like the deltas' _day()
+            query += " AND created_at >= %s"
+            params.append(datetime.combine(start, time.min, tzinfo=timezone.utc))
+        cur.execute(query + " GROUP BY 1, 2, 3", tuple(params))
+        records = cur.fetchall()
+
+        if start:
+            cur.execute("DELETE FROM fee_rollup WHERE date >= %s", (start,))
+        else:
+            cur.execute("DELETE FROM fee_rollup")
+        if records:
+            execute_values(cur, """
+                INSERT INTO fee_rollup (date, chain, type, fee_usd, tx_count)
+                VALUES %s
+            """, records)
+
+    print(f"✅ Rebuilt {len(records)} fee_rollup row(s){f' since {start}' if start else ''}.")
+
+
+def apply_fee_rollup_changes(conn, changes):
+    """
+    Folds a batch of ingested row changes into fee_rollup.
+    changes: list of (old, new) transaction snapshots (None when absent), as captured by ingestion.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FEE_ROLLUP_DDL)
+        cur.execute("SELECT 1 FROM fee_rollup LIMIT 1")
+        if cur.fetchone() is None:
+            # First run: the batch is already written, so a rebuild covers it
+            rebuild_fee_rollup(conn)
+            return
+
+    deltas = defaultdict(lambda: [0.0, 0])      # (date, chain, type) -> [fee_usd, tx_count]
+    for old, new in changes:
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if snapshot is None or snapshot.status != "SUCCESS":
+                continue
+            key = (_day(snapshot.created_at), snapshot.from_chain or "unknown", snapshot.type)
+            deltas[key][0] += sign * safe_float(snapshot.fee_usd)
+            deltas[key][1] += sign
+
+    records = [(*key, fee, count) for key, (fee, count) in deltas.items() if fee or count]
+    if not records:
+        return
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO fee_rollup (date, chain, type, fee_usd, tx_count)
+            VALUES %s
+            ON CONFLICT (date, chain, type) DO UPDATE SET
+                fee_usd = fee_rollup.fee_usd + EXCLUDED.fee_usd,
+                tx_count = fee_rollup.tx_count + EXCLUDED.tx_count
+        """, records)
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from psycopg2.extras import execute_values
+
+from helpers.utils import bitmaps
+from helpers.utils.safe_math import safe_float
+from helpers.utils.user_keys import intern_usernames, normalize_username
+
+# Hourly buckets of successful transactions, kept in step with ingestion
+HOURLY_STATS_DDL = """
+    CREATE TABLE IF NOT EXISTS hourly_stats (
+        hour TIMESTAMPTZ NOT NULL,
+        chain TEXT NOT NULL,
+        type TEXT NOT NULL,
+        tx_count BIGINT NOT NULL DEFAULT 0,
+        volume NUMERIC NOT NULL DEFAULT 0,
+        fees NUMERIC NOT NULL DEFAULT 0,
+        active_user_bitmap BYTEA,
+        PRIMARY KEY (hour, chain, type)
+    )
+"""
+
+# Rolling windows only ever look back this far
+HOURLY_RETENTION = timedelta(days=7)
+
+
+def hour_floor(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def rebuild_hourly_stats(conn, since: datetime):
+    """
+    Recomputes every bucket from `since` (floored to the hour) onwards from transactions_cache.
+    Used to seed the table and as a repair path. The caller is responsible for committing.
+    """
+    since = hour_floor(since)
+    with conn.cursor() as cur:
+        cur.execute(HOURLY_STATS_DDL)
+        cur.execute("""
+            SELECT date_trunc('hour', created_at), COALESCE(from_chain, 'unknown'), type,
+                   COUNT(*), COALESCE(SUM(amount_usd), 0), COALESCE(SUM(fee_usd), 0),
+                   ARRAY_REMOVE(ARRAY_AGG(DISTINCT from_user), NULL)
+            FROM transactions_cache
+            WHERE status = 'SUCCESS' AND created_at >= %s
+            GROUP BY 1, 2, 3
+        """, (since,))
+        rows = cur.fetchall()
+
+        keys = intern_usernames(conn, {u for *_, users in rows for u in users})
+        records = []
+        for hour, chain, typ, count, volume, fees, users in rows:
+            bits = bitmaps.from_keys(keys[normalize_username(u)] for u in users)
+            records.append((hour, chain, typ, count, volume, fees, bitmaps.encode(bits)))
+
+        cur.execute("DELETE FROM hourly_stats WHERE hour >= %s", (since,))
+        if records:
+            execute_values(cur, """
+                INSERT INTO hourly_stats (hour, chain, type, tx_count, volume, fees, active_user_bitmap)
+                VALUES %s
+            """, records)
+
+    print(f"✅ Rebuilt {len(records)} hourly_stats bucket(s) since {since.isoformat()}.")
+
+
+def _rebuild_bucket_users(cur, conn, hour: datetime, chain: str, typ: str):
+    cur.execute("""
+        SELECT DISTINCT from_user FROM transactions_cache
+        WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+          AND created_at >= %s AND created_at < %s
+          AND COALESCE(from_chain, 'unknown') = %s AND type = %s
+    """, (hour, hour + timedelta(hours=1), chain, typ))
+    keys = intern_usernames(conn, [r[0] for r in cur.fetchall()])
+    return bitmaps.from_keys(keys.values())
+
+
+def apply_hourly_stats_changes(conn, changes):
+    """
+    Folds a batch of ingested row changes into hourly_stats.
+    changes: list of (old, new) transaction snapshots (None when absent), as captured by ingestion.
+    """
+    cutoff = hour_floor(datetime.now(timezone.utc) - HOURLY_RETENTION)
+
+    with conn.cursor() as cur:
+        cur.execute(HOURLY_STATS_DDL)
+        cur.execute("SELECT 1 FROM hourly_stats LIMIT 1")
+        if cur.fetchone() is None:
+            # First run: the batch is already written, so a rebuild covers it
+            rebuild_hourly_stats(conn, cutoff)
+            return
+
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])     # (hour, chain, type) -> [count, volume, fees]
+    added_users = defaultdict(set)
+    shrunk = set()
+
+    def bucket(snapshot):
+        return hour_floor(snapshot.created_at), snapshot.from_chain or "unknown", snapshot.type
+
+    for old, new in changes:
+        if old is not None and old.status == "SUCCESS":
+            key = bucket(old)
+            if key[0] >= cutoff:
+                deltas[key][0] -= 1
+                deltas[key][1] -= safe_float(old.amount_usd)
+                deltas[key][2] -= safe_float(old.fee_usd)
+                shrunk.add(key)
+        if new is not None and new.status == "SUCCESS":
+            key = bucket(new)
+            if key[0] >= cutoff:
+                deltas[key][0] += 1
+                deltas[key][1] += safe_float(new.amount_usd)
+                deltas[key][2] += safe_float(new.fee_usd)
+                if new.from_user:
+                    added_users[key].add(new.from_user)
+
+    if not deltas:
+        return
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT hour, chain, type, active_user_bitmap FROM hourly_stats
+            WHERE (hour, chain, type) IN %s
+            FOR UPDATE
+        """, (tuple(deltas),))
+        stored = {(hour, chain, typ): bitmaps.decode(blob) for hour, chain, typ, blob in cur.fetchall()}
+
+        keys = intern_usernames(conn, {u for users in added_users.values() for u in users})
+        records = []
+        for key, (count, volume, fees) in deltas.items():
+            if key in shrunk:
+                # A user may have left the bucket; bitmaps can't subtract, so recount it
+                bits = _rebuild_bucket_users(cur, conn, *key)
+            else:
+                new_keys = [keys[normalize_username(u)] for u in added_users[key]]
+                bits = bitmaps.union(stored.get(key, bitmaps.decode(None)), bitmaps.from_keys(new_keys))
+            records.append((*key, count, volume, fees, bitmaps.encode(bits)))
+
+        execute_values(cur, """
+            INSERT INTO hourly_stats (hour, chain, type, tx_count, volume, fees, active_user_bitmap)
+            VALUES %s
+            ON CONFLICT (hour, chain, type) DO UPDATE SET
+                tx_count = hourly_stats.tx_count + EXCLUDED.tx_count,
+                volume = hourly_stats.volume + EXCLUDED.volume,
+                fees = hourly_stats.fees + EXCLUDED.fees,
+                active_user_bitmap = EXCLUDED.active_user_bitmap
+        """, records)
+
+        cur.execute("DELETE FROM hourly_stats WHERE hour < %s", (cutoff,))
@@ -0,0 +1,66 @@
+# Indexes on pre-existing tables that the dashboard fetchers filter on
+DASHBOARD_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_daily_app_downloads_date ON daily_app_downloads (date)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_total_balances_date ON daily_total_balances (date)",
+    "CREATE INDEX IF NOT EXISTS idx_weekly_stats_metric_week ON weekly_stats (metric, week_start_date)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_app_metrics_date_event ON daily_app_metrics (event_date, event_name)",
+    # Keyset pagination cursor for the Transactions table
+    "CREATE INDEX IF NOT EXISTS idx_transactions_cache_created_at_tx_hash ON transactions_cache (created_at, tx_hash)",
+)
+
+# Transaction search indexes, as (name, definition). Built CONCURRENTLY so ingestion keeps
+# writing to transactions_cache while they build:
+#   - btree on LOWER(...) for the exact email / wallet hits (= ANY)
+#   - trigram GIN so LOWER(...) LIKE '%term%' is an index scan
+SEARCH_INDEXES = (
+    ("idx_transactions_cache_from_user_lower", "transactions_cache (LOWER(from_user))"),
+    ("idx_transactions_cache_to_user_lower", "transactions_cache (LOWER(to_user))"),
+)
+TRIGRAM_INDEXES = (
+    ("idx_transactions_cache_from_user_trgm", "transactions_cache USING gin (LOWER(from_user) gin_trgm_ops)"),
+    ("idx_transactions_cache_to_user_trgm", "transactions_cache USING gin (LOWER(to_user) gin_trgm_ops)"),
+)
+
+
+def _create_index_concurrently(cur, name: str, definition: str):
+    # An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would keep skipping
+    cur.execute("""
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s
+    """, (name,))
+    row = cur.fetchone()
+    if row and not row[0]:
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def ensure_indexes(conn):
+    """
+    Creates any missing dashboard indexes. Safe to run on every cron invocation.
+    """
+    with conn.cursor() as cur:
+        for ddl in DASHBOARD_INDEXES:
+            cur.execute(ddl)
+    conn.commit()
+    print(f"✅ Ensured {len(DASHBOARD_INDEXES)} dashboard indexes.")
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for name, definition in SEARCH_INDEXES:
+                _create_index_concurrently(cur, name, definition)
+        print(f"✅ Ensured {len(SEARCH_INDEXES)} search indexes.")
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for name, definition in TRIGRAM_INDEXES:
+                    _create_index_concurrently(cur, name, definition)
+            print(f"✅ Ensured {len(TRIGRAM_INDEXES)} trigram search indexes.")
+        except Exception as e:
+            # pg_trgm may need a superuser to install; search still works, just unindexed
+            print(f"⚠️ Skipping trigram search indexes: {e}")
+    finally:
+        conn.autocommit = False
@@ -0,0 +1,269 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from psycopg2.extras import execute_values
+
+from helpers.fetch.user_bitmaps import fetch_cumulative_bitmap, fetch_user_bitmaps
+from helpers.upsert.user_bitmaps import ACTIVE_TYPES, DAILY_USER_BITMAPS_DDL
+from helpers.upsert.user_sketches import add_to_daily_user_sketches
+from helpers.utils import bitmaps
+from helpers.utils.safe_math import safe_float
+from helpers.utils.user_keys import intern_usernames, normalize_username
+
+# Rows already counted into today's daily_stats, so re-reads and later edits become exact deltas
+INTRADAY_JOURNAL_DDL = """
+    CREATE TABLE IF NOT EXISTS intraday_tx_journal (
+        tx_hash TEXT PRIMARY KEY,
+        date DATE NOT NULL,
+        chain_name TEXT,
+        type TEXT NOT NULL,
+        from_user TEXT,
+        amount_usd NUMERIC NOT NULL,
+        fee_usd NUMERIC NOT NULL
+    )
+"""
+
+# daily_stats counters that are pure sums over successful transactions
+ADDITIVE_COLUMNS = (
+    "swap_transactions", "swap_volume", "swap_revenue",
+    "send_transactions", "send_volume",
+    "cash_transactions", "cash_volume", "cash_revenue",
+    "dapp_connections", "revenue",
+)
+
+
+def _contribution(typ: str, amount: float, fee: float) -> dict:
+    """
+    What a single successful transaction adds to its daily_stats row.
+    """
+    delta = dict.fromkeys(ADDITIVE_COLUMNS, 0)
+    if typ == "SWAP":
+        delta.update(swap_transactions=1, swap_volume=amount, swap_revenue=fee)
+    elif typ == "SEND":
+        delta.update(send_transactions=1, send_volume=amount)
+    elif typ == "CASH":
+        delta.update(cash_transactions=1, cash_volume=amount, cash_revenue=fee)
+    elif typ == "DAPP":
+        delta.update(dapp_connections=1)
+    delta["revenue"] = fee
+    return delta
+
+
+def reset_intraday_journal(conn, day: date, rows):
+    """
+    Replaces the journal with the transactions the authoritative recompute just counted for `day`.
+    rows: iterable of (tx_hash, date, chain_name, type, from_user, amount_usd, fee_usd)
+    """
+    with conn.cursor() as cur:
+        cur.execute(INTRADAY_JOURNAL_DDL)
+        cur.execute("DELETE FROM intraday_tx_journal")
+        records = [r for r in rows if r[0] and r[1] == day and r[2]]
+        if records:
+            execute_values(cur, """
+                INSERT INTO intraday_tx_journal (
+                    tx_hash, date, chain_name, type, from_user, amount_usd, fee_usd
+                ) VALUES %s
+                ON CONFLICT (tx_hash) DO NOTHING
+            """, records)
+    conn.commit()
+    print(f"📒 Intraday journal reset with {len(records)} transaction(s) for {day}")
+
+
+def _rebuild_bitmap(cur, conn, day: date, dimension: str, label: str):
+    column = "type" if dimension == "type" else "from_chain"
+    cur.execute(f"""
+        SELECT DISTINCT from_user FROM transactions_cache
+        WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+          AND created_at >= %s AND created_at < %s AND {column} = %s
+    """, (day, day + timedelta(days=1), label))
+    keys = intern_usernames(conn, [r[0] for r in cur.fetchall()])
+    return bitmaps.from_keys(keys.values())
+
+
+def upsert_intraday_stats(since: datetime, day: date, conn):
+    """
+    Applies transactions ingested after `since` as additive deltas to `day`'s
+    daily_stats rows, activity bitmaps and daily_user_stats row.
+    Cost is proportional to the number of freshly ingested rows.
+    """
+    next_day = day + timedelta(days=1)
+
+    with conn.cursor() as cur:
+        cur.execute(INTRADAY_JOURNAL_DDL)
+        cur.execute(DAILY_USER_BITMAPS_DDL)
+        cur.execute("DELETE FROM intraday_tx_journal WHERE date < %s", (day,))
+        cur.execute("""
+            SELECT tx_hash, DATE(created_at), from_chain, type, status, from_user, amount_usd, fee_usd
+            FROM transactions_cache
+            WHERE ingested_at > %s AND created_at >= %s AND created_at < %s
+        """, (since, day, next_day))
+        fresh = cur.fetchall()
+
+        if not fresh:
+            print("✅ No newly ingested transactions for intraday stats.")
+            return
+
+        cur.execute("""
+            SELECT tx_hash, date, chain_name, type, from_user, amount_usd, fee_usd
+            FROM intraday_tx_journal
+            WHERE tx_hash = ANY(%s)
+        """, ([r[0] for r in fresh],))
+        counted = {r[0]: r[1:] for r in cur.fetchall()}
+
+    # === Diff each fresh row against what has already been counted ===
+    deltas = defaultdict(lambda: dict.fromkeys(ADDITIVE_COLUMNS, 0))
+    added_users = defaultdict(set)      # (dimension, label) -> usernames
+    sketch_users = defaultdict(set)     # (date, chain, type) -> usernames
+    removed_from = set()                # (dimension, label) that lost a transaction
+    journal_upserts, journal_deletes = [], []
+
+    for tx_hash, tx_date, chain, typ, status, from_user, amount, fee in fresh:
+        # Rows without a chain never make it into daily_stats (see upsert_daily_stats)
+        counts = status == "SUCCESS" and chain
+        new = (tx_date, chain, typ, from_user, safe_float(amount), safe_float(fee)) if counts else None
+        old = counted.get(tx_hash)
+        if old is not None:
+            old = (old[0], old[1], old[2], old[3], safe_float(old[4]), safe_float(old[5]))
+        if new == old:
+            continue
+
+        if old is not None:
+            for col, value in _contribution(old[2], old[4], old[5]).items():
+                deltas[(old[0], old[1])][col] -= value
+            removed_from.update({("type", old[2]), ("chain", old[1])})
+            journal_deletes.append(tx_hash)
+
+        if new is not None:
+            for col, value in _contribution(typ, new[4], new[5]).items():
+                deltas[(tx_date, chain)][col] += value
+            if from_user:
+                added_users[("type", typ)].add(from_user)
+                added_users[("chain", chain)].add(from_user)
+                sketch_users[(tx_date, chain, typ)].add(from_user)
+            journal_upserts.append((tx_hash, *new))
+
+    if not deltas:
+        print("✅ Freshly ingested transactions were already counted.")
+        return
+
+    # === Activity bitmaps: OR in new users; rebuild any bucket that lost a transaction ===
+    touched = set(added_users) | removed_from
+    with conn.cursor() as cur:
+        stored = {}
+        for dimension in ("type", "chain"):
+            labels = [label for dim, label in touched if dim == dimension]
+            if labels:
+                for (_, label), bits in fetch_user_bitmaps(conn, day, next_day, dimension, labels).items():
+                    stored[(dimension, label)] = bits
+
+        user_keys = intern_usernames(conn, {u for users in added_users.values() for u in users})
+        bitmap_records = []
+        for dimension, label in touched:
+            if (dimension, label) in removed_from:
+                bits = _rebuild_bitmap(cur, conn, day, dimension, label)
+            else:
+                keys = [user_keys[normalize_username(u)] for u in added_users[(dimension, label)]]
+                bits = bitmaps.union(stored.get((dimension, label), bitmaps.decode(None)), bitmaps.from_keys(keys))
+            stored[(dimension, label)] = bits
+            bitmap_records.append((day, dimension, label, bitmaps.encode(bits), bitmaps.cardinality(bits)))
+
+        execute_values(cur, """
+            INSERT INTO daily_user_bitmaps (date, dimension, label, bitmap, cardinality)
+            VALUES %s
+            ON CONFLICT (date, dimension, label) DO UPDATE SET
+                bitmap = EXCLUDED.bitmap,
+                cardinality = EXCLUDED.cardinality
+        """, bitmap_records)
+
+        # === daily_stats: add deltas, refresh per-chain actives from the chain bitmaps ===
+        chain_actives = {
+            label: bitmaps.cardinality(bits)
+            for (dimension, label), bits in stored.items() if dimension == "chain"
+        }
+        execute_values(cur, f"""
+            INSERT INTO daily_stats (
+                date, chain_name, {", ".join(ADDITIVE_COLUMNS)},
+                referrals, agents_deployed, active_users, new_users, new_active_users
+            ) VALUES %s
+            ON CONFLICT (date, chain_name) DO UPDATE SET
+                {", ".join(f"{col} = daily_stats.{col} + EXCLUDED.{col}" for col in ADDITIVE_COLUMNS)},
+                updated_at = now()
+        """, [
+            (
+                bucket_date, chain,
+                *(deltas[(bucket_date, chain)][col] for col in ADDITIVE_COLUMNS),
+                0, 0, chain_actives.get(chain, 0), 0, 0
+            )
+            for bucket_date, chain in deltas
+        ])
+        if chain_actives:
+            execute_values(cur, """
+                UPDATE daily_stats AS d
+                SET active_users = v.active_users, updated_at = now()
+                FROM (VALUES %s) AS v(date, chain_name, active_users)
+                WHERE d.date = v.date AND d.chain_name = v.chain_name
+            """, [(day, chain, count) for chain, count in chain_actives.items()])
+
+        # === Journal now reflects what has been counted ===
+        if journal_deletes:
+            cur.execute("DELETE FROM intraday_tx_journal WHERE tx_hash = ANY(%s)", (journal_deletes,))
+        if journal_upserts:
+            execute_values(cur, """
+                INSERT INTO intraday_tx_journal (
+                    tx_hash, date, chain_name, type, from_user, amount_usd, fee_usd
+                ) VALUES %s
+                ON CONFLICT (tx_hash) DO UPDATE SET
+                    date = EXCLUDED.date,
+                    chain_name = EXCLUDED.chain_name,
+                    type = EXCLUDED.type,
+                    from_user = EXCLUDED.from_user,
+                    amount_usd = EXCLUDED.amount_usd,
+                    fee_usd = EXCLUDED.fee_usd
+            """, journal_upserts)
+
+    # === User sketches only ever gain users; removals wait for the next full recompute ===
+    add_to_daily_user_sketches(conn, sketch_users)
+
+    # === daily_user_stats: recount today's actives from the updated type bitmaps ===
+    upsert_intraday_user_stats(day, conn)
+    conn.commit()
+
+    print(f"✅ Applied {len(journal_upserts) + len(journal_deletes)} intraday change(s) to {len(deltas)} daily_stats row(s).")
+
+
+def upsert_intraday_user_stats(day: date, conn):
+    """
+    Recounts `day`'s daily_user_stats actives from its (already updated) type bitmaps.
+    new_users is left to the nightly recompute since it doesn't depend on transactions.
+    """
+    _, past_active = fetch_cumulative_bitmap(conn, day, label="active")
+    daily = fetch_user_bitmaps(conn, day, day + timedelta(days=1), dimension="type", labels=ACTIVE_TYPES)
+
+    # Same definition as the full recompute in upsert_daily_user_stats: every sender counts,
+    # since they were interned into user_keys on the way into the type bitmaps
+    empty = bitmaps.decode(None)
+    swap_users = daily.get((day, "SWAP"), empty)
+    send_users = daily.get((day, "SEND"), empty)
+    cash_users = daily.get((day, "CASH"), empty)
+    active_users = bitmaps.union(swap_users, send_users, cash_users)
+    new_active_users = bitmaps.difference(active_users, past_active)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO daily_user_stats (
+                date, active_swap, active_send, active_cash,
+                total_active, new_users, new_active_users
+            ) VALUES (%s, %s, %s, %s, %s, 0, %s)
+            ON CONFLICT (date) DO UPDATE SET
+                active_swap = EXCLUDED.active_swap,
+                active_send = EXCLUDED.active_send,
+                active_cash = EXCLUDED.active_cash,
+                total_active = EXCLUDED.total_active,
+                new_active_users = EXCLUDED.new_active_users
+        """, (
+            day,
+            bitmaps.cardinality(swap_users),
+            bitmaps.cardinality(send_users),
+            bitmaps.cardinality(cash_users),
+            bitmaps.cardinality(active_users),
+            bitmaps.cardinality(new_active_users),
+        ))
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from psycopg2.extras import execute_values
+
+from helpers.fetch.user import fetch_top_users_by_metric
+from helpers.utils.constants import LEADERBOARD_CHAINS
+
+# Top-K leaderboards for the preset windows, recomputed by cron
+LEADERBOARD_SNAPSHOTS_DDL = """
+    CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+        window_key TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        chain TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        username TEXT NOT NULL,
+        value NUMERIC NOT NULL,
+        referral_count INTEGER,
+        watermark TIMESTAMPTZ,
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (window_key, metric, chain, rank)
+    )
+"""
+
+# Preset windows, as lookbacks from the time of computation (None = lifetime)
+LEADERBOARD_WINDOWS = {
+    "24h": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "lifetime": None,
+}
+LEADERBOARD_METRICS = ("swap", "cash", "referrals")
+ALL_CHAINS = "all"
+SNAPSHOT_SIZE = 100
+
+
+def refresh_leaderboard_snapshots(conn, watermark: datetime = None):
+    """
+    Recomputes every window × metric × chain-or-all leaderboard and replaces the stored
+    snapshots in one transaction, so readers never see a half-written set.
+    `watermark` is the transactions sync time the snapshots reflect.
+    """
+    now = datetime.now(timezone.utc)
+    records = []
+
+    for window_key, lookback in LEADERBOARD_WINDOWS.items():
+        start = now - lookback if lookback else None
+        for metric in LEADERBOARD_METRICS:
+            for chain in [ALL_CHAINS, *LEADERBOARD_CHAINS]:
+                rows = fetch_top_users_by_metric(
+                    conn,
+                    metric=metric,
+                    start_date=start,
+                    end_date=now if lookback else None,
+                    chains=None if chain == ALL_CHAINS else [chain],
+                    limit=SNAPSHOT_SIZE,
+                )
+                for rank, (username, value) in enumerate(rows, start=1):
+                    if metric == "referrals":
+                        records.append((window_key, metric, chain, rank, username, value["volume"], value["count"]))
+                    else:
+                        records.append((window_key, metric, chain, rank, username, float(value or 0), None))
+
+    with conn.cursor() as cur:
+        cur.execute(LEADERBOARD_SNAPSHOTS_DDL)
+        cur.execute("DELETE FROM leaderboard_snapshots")
+        if records:
+            execute_values(cur, """
+                INSERT INTO leaderboard_snapshots (
+                    window_key, metric, chain, rank, username, value, referral_count, watermark, computed_at
+                ) VALUES %s
+            """, [(*r, watermark, now) for r in records])
+    conn.commit()
+
+    print(f"✅ Stored {len(records)} leaderboard snapshot row(s) as of {now.isoformat()}.")
@@ -0,0 +1,148 @@
+from helpers.utils import bitmaps
+from helpers.utils.safe_math import safe_float
+from helpers.utils.user_keys import intern_usernames, normalize_username
+
+# Single-row running totals over every successful transaction, kept in step with ingestion
+LIFETIME_TOTALS_DDL = """
+    CREATE TABLE IF NOT EXISTS lifetime_totals (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        transactions BIGINT NOT NULL DEFAULT 0,
+        swap_transactions BIGINT NOT NULL DEFAULT 0,
+        swap_volume NUMERIC NOT NULL DEFAULT 0,
+        swap_revenue NUMERIC NOT NULL DEFAULT 0,
+        send_transactions BIGINT NOT NULL DEFAULT 0,
+        send_volume NUMERIC NOT NULL DEFAULT 0,
+        cash_transactions BIGINT NOT NULL DEFAULT 0,
+        cash_volume NUMERIC NOT NULL DEFAULT 0,
+        cash_revenue NUMERIC NOT NULL DEFAULT 0,
+        revenue NUMERIC NOT NULL DEFAULT 0,
+        user_bitmap BYTEA,
+        active_users INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+COUNTER_COLUMNS = (
+    "transactions",
+    "swap_transactions", "swap_volume", "swap_revenue",
+    "send_transactions", "send_volume",
+    "cash_transactions", "cash_volume", "cash_revenue",
+    "revenue",
+)
+
+
+def _contribution(typ: str, amount: float, fee: float) -> dict:
+    delta = dict.fromkeys(COUNTER_COLUMNS, 0)
+    delta["transactions"] = 1
+    delta["revenue"] = fee
+    if typ == "SWAP":
+        delta.update(swap_transactions=1, swap_volume=amount, swap_revenue=fee)
+    elif typ == "SEND":
+        delta.update(send_transactions=1, send_volume=amount)
+    elif typ == "CASH":
+        delta.update(cash_transactions=1, cash_volume=amount, cash_revenue=fee)
+    return delta
+
+
+def rebuild_lifetime_totals(conn):
+    """
+    Recomputes the totals row from transactions_cache. Used to seed the table
+    and as a repair path; ingestion keeps it current afterwards.
+    The caller is responsible for committing.
+    """
+    with conn.cursor() as cur:
+        cur.execute(LIFETIME_TOTALS_DDL)
+        cur.execute("""
+            SELECT
+                COUNT(*),
+                COUNT(*) FILTER (WHERE type = 'SWAP'),
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'SWAP'), 0),
+                COALESCE(SUM(fee_usd) FILTER (WHERE type = 'SWAP'), 0),
+                COUNT(*) FILTER (WHERE type = 'SEND'),
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'SEND'), 0),
+                COUNT(*) FILTER (WHERE type = 'CASH'),
+                COALESCE(SUM(amount_usd) FILTER (WHERE type = 'CASH'), 0),
+                COALESCE(SUM(fee_usd) FILTER (WHERE type = 'CASH'), 0),
+                COALESCE(SUM(fee_usd), 0)
+            FROM transactions_cache
+            WHERE status = 'SUCCESS'
+        """)
+        counters = cur.fetchone()
+
+        cur.execute("""
+            SELECT DISTINCT from_user FROM transactions_cache
+            WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+        """)
+        keys = intern_usernames(conn, [r[0] for r in cur.fetchall()])
+        bits = bitmaps.from_keys(keys.values())
+
+        cur.execute(f"""
+            INSERT INTO lifetime_totals ({", ".join(COUNTER_COLUMNS)}, user_bitmap, active_users, updated_at)
+            VALUES ({", ".join(["%s"] * len(COUNTER_COLUMNS))}, %s, %s, now())
+            ON CONFLICT (id) DO UPDATE SET
+                {", ".join(f"{col} = EXCLUDED.{col}" for col in COUNTER_COLUMNS)},
+                user_bitmap = EXCLUDED.user_bitmap,
+                active_users = EXCLUDED.active_users,
+                updated_at = EXCLUDED.updated_at
+        """, (*counters, bitmaps.encode(bits), bitmaps.cardinality(bits)))
+
+    print(f"✅ Rebuilt lifetime_totals ({counters[0]} transactions, {bitmaps.cardinality(bits)} users).")
+
+
+def apply_lifetime_totals_changes(conn, changes):
+    """
+    Folds a batch of ingested row changes into lifetime_totals.
+    changes: list of (old, new) transaction snapshots (None when absent), as captured by ingestion.
+    Runs inside the ingestion transaction, so the totals commit atomically with the batch.
+    """
+    with conn.cursor() as cur:
+        cur.execute(LIFETIME_TOTALS_DDL)
+        cur.execute("SELECT user_bitmap FROM lifetime_totals WHERE id FOR UPDATE")
+        row = cur.fetchone()
+
+    if row is None:
+        # First run: the batch is already written, so a rebuild covers it
+        rebuild_lifetime_totals(conn)
+        return
+
+    delta = dict.fromkeys(COUNTER_COLUMNS, 0)
+    added_users, dropped_users = set(), set()
+
+    for old, new in changes:
+        if old is not None and old.status == "SUCCESS":
+            for col, value in _contribution(old.type, safe_float(old.amount_usd), safe_float(old.fee_usd)).items():
+                delta[col] -= value
+            if old.from_user:
+                dropped_users.add(old.from_user)
+        if new is not None and new.status == "SUCCESS":
+            for col, value in _contribution(new.type, safe_float(new.amount_usd), safe_float(new.fee_usd)).items():
+                delta[col] += value
+            if new.from_user:
+                added_users.add(new.from_user)
+
+    bits = bitmaps.decode(row[0])
+    if added_users:
+        keys = intern_usernames(conn, added_users)
+        bits = bitmaps.union(bits, bitmaps.from_keys(keys.values()))
+
+    # A user only leaves the set once they have no successful transaction left
+    dropped_users = {normalize_username(u) for u in dropped_users} - {normalize_username(u) for u in added_users}
+    if dropped_users:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT LOWER(TRIM(from_user)) FROM transactions_cache
+                WHERE status = 'SUCCESS' AND LOWER(TRIM(from_user)) = ANY(%s)
+            """, (list(dropped_users),))
+            still_active = {r[0] for r in cur.fetchall()}
+        gone = intern_usernames(conn, dropped_users - still_active)
+        bits = bitmaps.difference(bits, bitmaps.from_keys(gone.values()))
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            UPDATE lifetime_totals SET
+                {", ".join(f"{col} = {col} + %s" for col in COUNTER_COLUMNS)},
+                user_bitmap = %s,
+                active_users = %s,
+                updated_at = now()
+            WHERE id
+        """, (*(delta[col] for col in COUNTER_COLUMNS), bitmaps.encode(bits), bitmaps.cardinality(bits)))
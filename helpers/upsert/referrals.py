@@ -0,0 +1,68 @@
+from psycopg2.extras import execute_values
+
+# Referral edges copied from the main DB's "User" self-reference, one row per referred user
+REFERRALS_DDL = """
+    CREATE TABLE IF NOT EXISTS referrals (
+        referred_user TEXT PRIMARY KEY,
+        referrer_user TEXT NOT NULL,
+        referred_at TIMESTAMPTZ,
+        synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# Tables created before full copies swept stale edges have no synced_at yet
+REFERRALS_SYNCED_AT_DDL = """
+    ALTER TABLE referrals ADD COLUMN IF NOT EXISTS synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+"""
+
+REFERRALS_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_referrals_referrer_user ON referrals (referrer_user)
+"""
+
+
+def upsert_referrals(since, main_conn, cache_conn, run_started):
+    """
+    Copies referral edges for users who signed up at or after `since` (all of them if None)
+    from the main DB into the cache DB's referrals table.
+    A full copy also deletes edges it did not see, so renamed users and removed
+    referrers do not linger.
+    """
+    query = """
+        SELECT r.username, u.username, r."createdAt"
+        FROM "User" r
+        JOIN "User" u ON r."referredBy" = u."referId"
+        WHERE r.username IS NOT NULL AND u.username IS NOT NULL
+    """
+    params = []
+    if since:
+        query += ' AND r."createdAt" >= %s'
+        params.append(since)
+
+    with main_conn.cursor() as cur:
+        cur.execute(query, tuple(params))
+        records = cur.fetchall()
+
+    with cache_conn.cursor() as cur:
+        cur.execute(REFERRALS_DDL)
+        cur.execute(REFERRALS_SYNCED_AT_DDL)
+        cur.execute(REFERRALS_INDEX_DDL)
+        if records:
+            execute_values(cur, """
+                INSERT INTO referrals (referred_user, referrer_user, referred_at, synced_at)
+                VALUES %s
+                ON CONFLICT (referred_user) DO UPDATE SET
+                    referrer_user = EXCLUDED.referrer_user,
+                    referred_at = EXCLUDED.referred_at,
+                    synced_at = EXCLUDED.synced_at
+            """, [(*record, run_started) for record in records])
+
+        removed = 0
+        if since is None:
+            cur.execute("DELETE FROM referrals WHERE synced_at < %s", (run_started,))
+            removed = cur.rowcount
+    cache_conn.commit()
+
+    print(
+        f"✅ Upserted {len(records)} referral edge(s){f' since {since}' if since else ''}"
+        f"{f', removed {removed} stale' if removed else ''}."
+    )
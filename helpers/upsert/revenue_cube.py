@@ -0,0 +1,54 @@
+from datetime import date
+
+from helpers.upsert.fee_rollup import FEE_ROLLUP_DDL
+
+# Fees and counts by period × chain × type at day / week / month grain, built from fee_rollup
+REVENUE_CUBE_DDL = """
+    CREATE TABLE IF NOT EXISTS revenue_cube (
+        grain TEXT NOT NULL,
+        period_start DATE NOT NULL,
+        chain TEXT NOT NULL,
+        type TEXT NOT NULL,
+        fee_usd NUMERIC NOT NULL DEFAULT 0,
+        tx_count BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (grain, period_start, chain, type)
+    )
+"""
+
+GRAINS = ("day", "week", "month")
+
+
+def refresh_revenue_cube(conn, start: date = None):
+    """
+    Recomputes every cube period that overlaps days >= start (everything if None)
+    from fee_rollup, one set-based statement per grain.
+    The first run builds the whole cube. The caller is responsible for committing.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FEE_ROLLUP_DDL)
+        cur.execute(REVENUE_CUBE_DDL)
+        cur.execute("SELECT 1 FROM revenue_cube LIMIT 1")
+        if cur.fetchone() is None:
+            start = None
+
+        for grain in GRAINS:
+            # Redo the whole period containing `start`, not just the days after it
+            period_floor = None
+            if start:
+                cur.execute("SELECT DATE(date_trunc(%s, %s::date))", (grain, start))
+                period_floor = cur.fetchone()[0]
+
+            if period_floor:
+                cur.execute("DELETE FROM revenue_cube WHERE grain = %s AND period_start >= %s", (grain, period_floor))
+            else:
+                cur.execute("DELETE FROM revenue_cube WHERE grain = %s", (grain,))
+
+            cur.execute("""
+                INSERT INTO revenue_cube (grain, period_start, chain, type, fee_usd, tx_count)
+                SELECT %(grain)s, DATE(date_trunc(%(grain)s, date)), chain, type, SUM(fee_usd), SUM(tx_count)
+                FROM fee_rollup
+                WHERE %(floor)s::date IS NULL OR date >= %(floor)s::date
+                GROUP BY 2, 3, 4
+            """, {"grain": grain, "floor": period_floor})
+
+    print(f"✅ Refreshed revenue_cube{f' from {start}' if start else ''}.")
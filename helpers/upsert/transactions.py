@@ -1,4 +1,78 @@
 # helpers/upsert/transactions.py
+from collections import namedtuple
+
+
+def ensure_ingested_at_column(conn):
+    """
+    Adds the `ingested_at` marker used by incremental consumers (e.g. the intraday refresh)
+    to find rows written or materially changed since their last run.
+    One-time setup run by cron_sync.py; the ALTER takes an ACCESS EXCLUSIVE lock, so keep it off the ingestion path.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            ALTER TABLE transactions_cache
+            ADD COLUMN IF NOT EXISTS ingested_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transactions_cache_ingested_at
+            ON transactions_cache (ingested_at)
+        """)
+    conn.commit()
+
+
+# Held for each ingestion batch (and while seeding rollups) so overlapping runs - the intraday
+# cron, the nightly cron and the Transactions page's Force Sync - apply their batches one at a time
+INGESTION_LOCK_ID = 742002
+
+
+def lock_ingestion(cur):
+    """
+    Transaction-level lock serializing writers of transactions_cache and its rollups;
+    released when the caller commits or rolls back.
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (INGESTION_LOCK_ID,))
+
+
+# Fields of a cached transaction that derived totals depend on
+TxSnapshot = namedtuple("TxSnapshot", [
+    "tx_hash", "created_at", "type", "status", "from_user", "from_chain", "amount_usd", "fee_usd"
+])
+
+
+def _snapshot_transactions(cur, tx_hashes) -> dict:
+    """
+    Current counted fields of already-cached transactions. Only meaningful under
+    lock_ingestion: FOR UPDATE cannot lock rows another run is about to insert.
+    """
+    cur.execute(f"""
+        SELECT {", ".join(TxSnapshot._fields)}
+        FROM transactions_cache
+        WHERE tx_hash = ANY(%s)
+        FOR UPDATE
+    """, (list(tx_hashes),))
+    return {row[0]: TxSnapshot(*row) for row in cur.fetchall()}
+
+
+def apply_transaction_changes(conn, changes):
+    """
+    Hands a batch's (old, new) snapshots to every incrementally maintained rollup,
+    inside the same transaction as the batch itself. Pairs where nothing changed are dropped.
+    """
+    from helpers.upsert.lifetime_totals import apply_lifetime_totals_changes
+    from helpers.upsert.hourly_stats import apply_hourly_stats_changes
+    from helpers.upsert.fee_rollup import apply_fee_rollup_changes
+    from helpers.upsert.user_daily_activity import apply_user_daily_activity_changes
+
+    # Re-ingesting an unchanged row is a no-op for every rollup (and would make
+    # hourly_stats recount the bucket's users)
+    changes = [(old, new) for old, new in changes if old != new]
+    if not changes:
+        return
+    apply_lifetime_totals_changes(conn, changes)
+    apply_hourly_stats_changes(conn, changes)
+    apply_fee_rollup_changes(conn, changes)
+    apply_user_daily_activity_changes(conn, changes)
+
 
 def upsert_transactions_from_activity(force=False, batch_size=100, start=None, end=None):
     from datetime import datetime, timedelta, timezone
@@ -42,6 +116,7 @@ def upsert_transactions_from_activity(force=False, batch_size=100, start=None, e
             if not rows:
                 break
 
+            records = []
             for created_at, user_id, typ, status, tx_hash, txn_raw, chain_ids in rows:
                 try:
                     tx_data = transform_activity_transaction(
@@ -69,13 +144,39 @@ def upsert_transactions_from_activity(force=False, batch_size=100, start=None, e
                     if isinstance(tx_display, dict):
                         tx_display = tx_display.get("text") or str(tx_display)
 
-                    cur_cache.execute("""
+                    records.append((
+                        tx_data["created_at"], tx_data["type"], tx_data["status"],
+                        tx_data["from_user"], to_user,
+                        tx_data["from_token"], tx_data["from_chain"],
+                        tx_data["to_token"], tx_data["to_chain"],
+                        safe_float(tx_data.get("amount_usd")), safe_float(tx_data.get("fee_usd")),
+                        tx_data["tx_hash"], tx_data["chain_id"], tx_display
+                    ))
+
+                except Exception as e:
+                    print(f"❌ Error processing transaction: {e}")
+                    continue
+
+            if not records:
+                continue
+
+            # === Capture each row's counted fields before and after, for the derived totals ===
+            lock_ingestion(cur_cache)
+            previous = _snapshot_transactions(cur_cache, [r[11] for r in records])
+            changes = []
+
+            for record in records:
+                try:
+                    # A failed row must not abort the rest of the batch's transaction
+                    cur_cache.execute("SAVEPOINT tx_row")
+                    cur_cache.execute(f"""
                         INSERT INTO transactions_cache (
                             created_at, type, status, from_user, to_user,
                             from_token, from_chain, to_token, to_chain,
                             amount_usd, fee_usd, tx_hash, chain_id, tx_display
                         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                         ON CONFLICT (tx_hash) DO UPDATE SET
+                            type = EXCLUDED.type,
                             amount_usd = EXCLUDED.amount_usd,
                             fee_usd = EXCLUDED.fee_usd,
                             to_user = EXCLUDED.to_user,
@@ -86,21 +187,33 @@ def upsert_transactions_from_activity(force=False, batch_size=100, start=None, e
                             to_chain = EXCLUDED.to_chain,
                             status = EXCLUDED.status,
                             tx_display = EXCLUDED.tx_display,
-                            created_at = EXCLUDED.created_at
-                    """, (
-                        tx_data["created_at"], tx_data["type"], tx_data["status"],
-                        tx_data["from_user"], to_user,
-                        tx_data["from_token"], tx_data["from_chain"],
-                        tx_data["to_token"], tx_data["to_chain"],
-                        safe_float(tx_data.get("amount_usd")), safe_float(tx_data.get("fee_usd")),
-                        tx_data["tx_hash"], tx_data["chain_id"], tx_display
-                    ))
+                            created_at = EXCLUDED.created_at,
+                            ingested_at = CASE
+                                WHEN (transactions_cache.type, transactions_cache.status,
+                                      transactions_cache.amount_usd, transactions_cache.fee_usd,
+                                      transactions_cache.from_user, transactions_cache.from_chain,
+                                      transactions_cache.created_at)
+                                     IS DISTINCT FROM
+                                     (EXCLUDED.type, EXCLUDED.status, EXCLUDED.amount_usd,
+                                      EXCLUDED.fee_usd, EXCLUDED.from_user, EXCLUDED.from_chain,
+                                      EXCLUDED.created_at)
+                                THEN now()
+                                ELSE transactions_cache.ingested_at
+                            END
+                        RETURNING {", ".join(TxSnapshot._fields)}
+                    """, record)
+                    # Read back as stored, so an unchanged re-ingest compares equal to its snapshot
+                    new = TxSnapshot(*cur_cache.fetchone())
+                    changes.append((previous.get(new.tx_hash), new))
+                    previous[new.tx_hash] = new
 
                     insert_count += 1
 
                 except Exception as e:
-                    print(f"❌ Error processing transaction: {e}")
+                    cur_cache.execute("ROLLBACK TO SAVEPOINT tx_row")
+                    print(f"❌ Error writing transaction: {e}")
                     continue
 
+            apply_transaction_changes(cache_conn, changes)
             cache_conn.commit()
 
@@ -0,0 +1,112 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
+
+from helpers.fetch.user_bitmaps import fetch_cumulative_bitmap
+from helpers.utils import bitmaps
+from helpers.utils.user_keys import intern_usernames, normalize_username
+
+# Transaction types that count a user as "active" in daily_user_stats
+ACTIVE_TYPES = ("SWAP", "SEND", "CASH")
+
+DAILY_USER_BITMAPS_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_user_bitmaps (
+        date DATE NOT NULL,
+        dimension TEXT NOT NULL,
+        label TEXT NOT NULL,
+        bitmap BYTEA NOT NULL,
+        cardinality INTEGER NOT NULL,
+        PRIMARY KEY (date, dimension, label)
+    )
+"""
+
+
+def upsert_daily_user_bitmaps(start: datetime, conn, end: datetime = None):
+    """
+    Rebuilds per-day activity bitmaps (keyed by interned user keys) for the range:
+      - dimension 'type'       → users with a successful txn of that type on the day
+      - dimension 'chain'      → users with a successful txn on that from_chain on the day
+      - dimension 'cumulative' → users ever active up to and including the day
+                                 ('active' = ACTIVE_TYPES only, 'all' = any type)
+    The first run backfills from the earliest cached transaction.
+    """
+    start_date = start.date()
+    end_date = (end or datetime.utcnow()).date() + timedelta(days=1)
+
+    with conn.cursor() as cur:
+        cur.execute(DAILY_USER_BITMAPS_DDL)
+        cur.execute("SELECT 1 FROM daily_user_bitmaps LIMIT 1")
+        if cur.fetchone() is None:
+            cur.execute("SELECT MIN(created_at) FROM transactions_cache WHERE status = 'SUCCESS'")
+            first_txn = cur.fetchone()[0]
+            if first_txn and first_txn.date() < start_date:
+                start_date = first_txn.date()
+                print(f"🧱 No activity bitmaps yet, backfilling from {start_date}")
+
+        cur.execute("""
+            SELECT DATE(created_at), type, from_chain, from_user
+            FROM transactions_cache
+            WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+              AND created_at >= %s AND created_at < %s
+            GROUP BY 1, 2, 3, 4
+        """, (start_date, end_date))
+        rows = cur.fetchall()
+
+    if not rows:
+        print("✅ No activity to encode into daily_user_bitmaps.")
+        return
+
+    user_keys = intern_usernames(conn, {r[3] for r in rows})
+
+    # === Collect user keys per day for each dimension ===
+    type_keys = defaultdict(lambda: defaultdict(set))
+    chain_keys = defaultdict(lambda: defaultdict(set))
+    for day, typ, chain, from_user in rows:
+        key = user_keys.get(normalize_username(from_user))
+        if key is None:
+            continue
+        type_keys[day][typ].add(key)
+        chain_keys[day][chain or "unknown"].add(key)
+
+    # === Roll the cumulative bitmaps forward from the day before the range ===
+    cumulative = {
+        label: fetch_cumulative_bitmap(conn, start_date, label=label)[1]
+        for label in ("active", "all")
+    }
+
+    records = []
+
+    def add_record(day, dimension, label, bits):
+        records.append((day, dimension, label, bitmaps.encode(bits), bitmaps.cardinality(bits)))
+
+    for day in sorted(type_keys):
+        by_type = {typ: bitmaps.from_keys(keys) for typ, keys in type_keys[day].items()}
+        for typ, bits in by_type.items():
+            add_record(day, "type", typ, bits)
+        for chain, keys in chain_keys[day].items():
+            add_record(day, "chain", chain, bitmaps.from_keys(keys))
+
+        cumulative["all"] = bitmaps.union(cumulative["all"], *by_type.values())
+        cumulative["active"] = bitmaps.union(
+            cumulative["active"], *(by_type[t] for t in ACTIVE_TYPES if t in by_type)
+        )
+        for label, bits in cumulative.items():
+            add_record(day, "cumulative", label, bits)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM daily_user_bitmaps
+            WHERE date >= %s AND date < %s
+              AND dimension IN ('type', 'chain', 'cumulative')
+        """, (start_date, end_date))
+        execute_values(cur, """
+            INSERT INTO daily_user_bitmaps (date, dimension, label, bitmap, cardinality)
+            VALUES %s
+            ON CONFLICT (date, dimension, label) DO UPDATE SET
+                bitmap = EXCLUDED.bitmap,
+                cardinality = EXCLUDED.cardinality
+        """, records)
+    conn.commit()
+
+    print(f"✅ Upserted {len(records)} rows into daily_user_bitmaps ({start_date} → {end_date}).")
+
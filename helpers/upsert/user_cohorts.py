@@ -0,0 +1,194 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from psycopg2.extras import execute_values
+
+from helpers.fetch.user_bitmaps import fetch_user_bitmaps
+from helpers.upsert.user_bitmaps import ACTIVE_TYPES, DAILY_USER_BITMAPS_DDL
+from helpers.utils import bitmaps
+from helpers.utils.calendar import week_start
+from helpers.utils.user_keys import intern_usernames, normalize_username
+
+# Cohorts are followed for this many weeks after signup, which bounds how many
+# signup bitmaps a run has to load however long the history gets
+MAX_RETENTION_WEEKS = 52
+
+ROLLING_ACTIVE_USERS_DDL = """
+    CREATE TABLE IF NOT EXISTS rolling_active_users (
+        date DATE PRIMARY KEY,
+        dau INTEGER NOT NULL,
+        wau INTEGER NOT NULL,
+        mau INTEGER NOT NULL,
+        stickiness DOUBLE PRECISION NOT NULL,
+        dau_all_types INTEGER
+    )
+"""
+
+# DAU over every transaction type, comparable with daily_stats.active_users;
+# added after the table first shipped, so older rows stay NULL until recomputed
+ROLLING_DAU_ALL_TYPES_DDL = """
+    ALTER TABLE rolling_active_users ADD COLUMN IF NOT EXISTS dau_all_types INTEGER
+"""
+
+COHORT_RETENTION_DDL = """
+    CREATE TABLE IF NOT EXISTS cohort_retention (
+        cohort_week DATE NOT NULL,
+        week_offset INTEGER NOT NULL,
+        cohort_size INTEGER NOT NULL,
+        retained_users INTEGER NOT NULL,
+        retention_rate DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (cohort_week, week_offset)
+    )
+"""
+
+
+def upsert_signup_bitmaps(start: date, end: date, conn):
+    """
+    Stores the users who signed up on each day in [start, end) as
+    daily_user_bitmaps rows with dimension 'signup'.
+    The first run backfills from the earliest cached user.
+    """
+    with conn.cursor() as cur:
+        cur.execute(DAILY_USER_BITMAPS_DDL)
+        cur.execute("SELECT 1 FROM daily_user_bitmaps WHERE dimension = 'signup' LIMIT 1")
+        if cur.fetchone() is None:
+            cur.execute("SELECT MIN(created_at) FROM users")
+            first_signup = cur.fetchone()[0]
+            if first_signup and first_signup.date() < start:
+                start = first_signup.date()
+                print(f"🧱 No signup bitmaps yet, backfilling from {start}")
+
+        cur.execute("""
+            SELECT DATE(created_at), username
+            FROM users
+            WHERE username IS NOT NULL AND created_at >= %s AND created_at < %s
+        """, (start, end))
+        rows = cur.fetchall()
+
+    user_keys = intern_usernames(conn, {r[1] for r in rows})
+    signups = defaultdict(set)
+    for day, username in rows:
+        key = user_keys.get(normalize_username(username))
+        if key is not None:
+            signups[day].add(key)
+
+    records = []
+    for day, keys in signups.items():
+        bits = bitmaps.from_keys(keys)
+        records.append((day, "signup", "all", bitmaps.encode(bits), bitmaps.cardinality(bits)))
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM daily_user_bitmaps
+            WHERE dimension = 'signup' AND date >= %s AND date < %s
+        """, (start, end))
+        if records:
+            execute_values(cur, """
+                INSERT INTO daily_user_bitmaps (date, dimension, label, bitmap, cardinality)
+                VALUES %s
+            """, records)
+
+    print(f"✅ Stored signup bitmaps for {len(records)} day(s): {start} → {end}")
+
+
+def upsert_user_cohorts(start: date, end: date, conn):
+    """
+    Single pass over daily activity bitmaps for days in [start, end):
+      - rolling_active_users: exact distinct actives over 1/7/30-day windows + DAU/MAU stickiness,
+        plus a DAU over every transaction type
+      - cohort_retention: for every week touched, the share of each signup-week cohort
+        from the last MAX_RETENTION_WEEKS weeks active in that week
+    Only the days in range (plus a 29-day lookback) are read, so a nightly run costs one day.
+    Today is still being ingested, so it gets no rolling row; readers fall back to the
+    intraday-maintained daily_stats until the next run after midnight writes it.
+    """
+    upsert_signup_bitmaps(start, end, conn)
+
+    with conn.cursor() as cur:
+        cur.execute(ROLLING_ACTIVE_USERS_DDL)
+        cur.execute(ROLLING_DAU_ALL_TYPES_DDL)
+        cur.execute(COHORT_RETENTION_DDL)
+
+    # === Daily active bitmaps (any ACTIVE_TYPE / any type) with a 30-day lookback ===
+    lookback = start - timedelta(days=29)
+    first_week = week_start(start)
+    daily_by_type = fetch_user_bitmaps(conn, min(lookback, first_week), end, dimension="type")
+    daily_active = defaultdict(lambda: bitmaps.decode(None))
+    daily_any = defaultdict(lambda: bitmaps.decode(None))
+    for (day, typ), bits in daily_by_type.items():
+        daily_any[day] = bitmaps.union(daily_any[day], bits)
+        if typ in ACTIVE_TYPES:
+            daily_active[day] = bitmaps.union(daily_active[day], bits)
+
+    def active_between(first: date, last: date):
+        return bitmaps.union(*(
+            daily_active[first + timedelta(days=i)]
+            for i in range((last - first).days + 1)
+            if first + timedelta(days=i) in daily_active
+        ))
+
+    # === Rolling DAU / WAU / MAU ===
+    rolling_rows = []
+    today = datetime.now(timezone.utc).date()
+    day = start
+    while day < min(end, today):
+        dau = bitmaps.cardinality(daily_active.get(day, bitmaps.decode(None)))
+        wau = bitmaps.cardinality(active_between(day - timedelta(days=6), day))
+        mau = bitmaps.cardinality(active_between(day - timedelta(days=29), day))
+        dau_all_types = bitmaps.cardinality(daily_any.get(day, bitmaps.decode(None)))
+        rolling_rows.append((day, dau, wau, mau, dau / mau if mau else 0.0, dau_all_types))
+        day += timedelta(days=1)
+
+    # === Weekly signup-cohort retention for every week touched by the range ===
+    first_cohort = first_week - timedelta(weeks=MAX_RETENTION_WEEKS)
+    signups = fetch_user_bitmaps(conn, start=first_cohort, end=end, dimension="signup", labels=["all"])
+    cohorts = defaultdict(lambda: bitmaps.decode(None))
+    for (signup_day, _), bits in signups.items():
+        cohort = week_start(signup_day)
+        cohorts[cohort] = bitmaps.union(cohorts[cohort], bits)
+
+    retention_rows = []
+    week = first_week
+    while week < end:
+        active_week = active_between(week, min(week + timedelta(days=6), end - timedelta(days=1)))
+        for cohort_week, members in cohorts.items():
+            week_offset = (week - cohort_week).days // 7
+            if not 0 <= week_offset <= MAX_RETENTION_WEEKS:
+                continue
+            cohort_size = bitmaps.cardinality(members)
+            retained = bitmaps.cardinality(bitmaps.intersect(members, active_week))
+            retention_rows.append((
+                cohort_week,
+                week_offset,
+                cohort_size,
+                retained,
+                retained / cohort_size if cohort_size else 0.0,
+            ))
+        week += timedelta(days=7)
+
+    with conn.cursor() as cur:
+        # Partial rows for today written by earlier runs would shadow the fresh fallback
+        cur.execute("DELETE FROM rolling_active_users WHERE date >= %s", (today,))
+        if rolling_rows:
+            execute_values(cur, """
+                INSERT INTO rolling_active_users (date, dau, wau, mau, stickiness, dau_all_types)
+                VALUES %s
+                ON CONFLICT (date) DO UPDATE SET
+                    dau = EXCLUDED.dau,
+                    wau = EXCLUDED.wau,
+                    mau = EXCLUDED.mau,
+                    stickiness = EXCLUDED.stickiness,
+                    dau_all_types = EXCLUDED.dau_all_types
+            """, rolling_rows)
+        if retention_rows:
+            execute_values(cur, """
+                INSERT INTO cohort_retention (
+                    cohort_week, week_offset, cohort_size, retained_users, retention_rate
+                ) VALUES %s
+                ON CONFLICT (cohort_week, week_offset) DO UPDATE SET
+                    cohort_size = EXCLUDED.cohort_size,
+                    retained_users = EXCLUDED.retained_users,
+                    retention_rate = EXCLUDED.retention_rate
+            """, retention_rows)
+    conn.commit()
+
+    print(f"✅ Upserted {len(rolling_rows)} rolling_active_users and {len(retention_rows)} cohort_retention rows.")
@@ -0,0 +1,121 @@
+from collections import defaultdict
+from datetime import datetime, time, timezone
+from psycopg2.extras import execute_values
+
+from helpers.upsert.fee_rollup import _day
+from helpers.upsert.transactions import lock_ingestion
+from helpers.utils.safe_math import safe_float
+
+# Successful transactions pre-summed per (user, day, chain, type), kept in step with ingestion
+USER_DAILY_ACTIVITY_DDL = """
+    CREATE TABLE IF NOT EXISTS user_daily_activity (
+        username TEXT NOT NULL,
+        date DATE NOT NULL,
+        chain TEXT NOT NULL,
+        type TEXT NOT NULL,
+        tx_count BIGINT NOT NULL DEFAULT 0,
+        volume_usd NUMERIC NOT NULL DEFAULT 0,
+        fee_usd NUMERIC NOT NULL DEFAULT 0,
+        PRIMARY KEY (username, date, chain, type)
+    )
+"""
+
+# Leaderboards filter on type + date range (+ chain) and group by user
+USER_DAILY_ACTIVITY_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_user_daily_activity_type_date
+    ON user_daily_activity (type, date, chain) INCLUDE (username, volume_usd)
+"""
+
+
+def rebuild_user_daily_activity(conn, start=None):
+    """
+    Recomputes user_daily_activity from transactions_cache for days >= start (everything if None).
+    Used to seed the table and as a repair path. The caller is responsible for committing.
+    """
+    with conn.cursor() as cur:
+        cur.execute(USER_DAILY_ACTIVITY_DDL)
+        cur.execute(USER_DAILY_ACTIVITY_INDEX_DDL)
+        query = """
+            SELECT from_user, DATE(created_at AT TIME ZONE 'UTC'), COALESCE(from_chain, 'unknown'), type,
+                   COUNT(*), COALESCE(SUM(amount_usd), 0), COALESCE(SUM(fee_usd), 0)
+            FROM transactions_cache
+            WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+        """
+        params = []
+        if start:
+            # UTC days, like the deltas' _day()
+            query += " AND created_at >= %s"
+            params.append(datetime.combine(start, time.min, tzinfo=timezone.utc))
+        cur.execute(query + " GROUP BY 1, 2, 3, 4", tuple(params))
+        records = cur.fetchall()
+
+        if start:
+            cur.execute("DELETE FROM user_daily_activity WHERE date >= %s", (start,))
+        else:
+            cur.execute("DELETE FROM user_daily_activity")
+        if records:
+            execute_values(cur, """
+                INSERT INTO user_daily_activity (username, date, chain, type, tx_count, volume_usd, fee_usd)
+                VALUES %s
+            """, records)
+
+    print(f"✅ Rebuilt {len(records)} user_daily_activity row(s){f' since {start}' if start else ''}.")
+
+
+def seed_user_daily_activity(conn):
+    """
+    Creates user_daily_activity and fills it from transactions_cache if it is empty.
+    One-time setup run by cron_sync.py, so ingestion only ever applies deltas.
+    Holds the ingestion lock until the seed commits: a batch committed mid-seed would
+    otherwise find no table, skip its deltas, and be missed by the seed's snapshot too.
+    """
+    with conn.cursor() as cur:
+        lock_ingestion(cur)
+        cur.execute(USER_DAILY_ACTIVITY_DDL)
+        cur.execute(USER_DAILY_ACTIVITY_INDEX_DDL)
+        cur.execute("SELECT 1 FROM user_daily_activity LIMIT 1")
+        if cur.fetchone() is None:
+            print("🧱 user_daily_activity is empty, seeding it from transactions_cache")
+            rebuild_user_daily_activity(conn)
+    conn.commit()
+
+
+def apply_user_daily_activity_changes(conn, changes):
+    """
+    Folds a batch of ingested row changes into user_daily_activity.
+    changes: list of (old, new) transaction snapshots (None when absent), as captured by ingestion.
+    Skipped until seed_user_daily_activity has created the table; its seed covers these rows.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('user_daily_activity')")
+        if cur.fetchone()[0] is None:
+            return
+
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])     # (user, date, chain, type) -> [count, volume, fees]
+    for old, new in changes:
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if snapshot is None or snapshot.status != "SUCCESS" or not snapshot.from_user:
+                continue
+            key = (snapshot.from_user, _day(snapshot.created_at), snapshot.from_chain or "unknown", snapshot.type)
+            deltas[key][0] += sign
+            deltas[key][1] += sign * safe_float(snapshot.amount_usd)
+            deltas[key][2] += sign * safe_float(snapshot.fee_usd)
+
+    records = [(*key, count, volume, fees) for key, (count, volume, fees) in deltas.items() if count or volume or fees]
+    if not records:
+        return
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO user_daily_activity (username, date, chain, type, tx_count, volume_usd, fee_usd)
+            VALUES %s
+            ON CONFLICT (username, date, chain, type) DO UPDATE SET
+                tx_count = user_daily_activity.tx_count + EXCLUDED.tx_count,
+                volume_usd = user_daily_activity.volume_usd + EXCLUDED.volume_usd,
+                fee_usd = user_daily_activity.fee_usd + EXCLUDED.fee_usd
+        """, records)
+        # Rows whose last transaction moved away carry no information
+        cur.execute("""
+            DELETE FROM user_daily_activity
+            WHERE tx_count <= 0 AND (username, date, chain, type) IN %s
+        """, (tuple(tuple(r[:4]) for r in records),))
@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta
+from psycopg2.extras import execute_values
+
+# Signups per day with a running total, from the cached `users` table
+USER_SIGNUPS_DAILY_DDL = """
+    CREATE TABLE IF NOT EXISTS user_signups_daily (
+        date DATE PRIMARY KEY,
+        new_users INTEGER NOT NULL,
+        cumulative_users BIGINT NOT NULL
+    )
+"""
+
+# Count of every main-DB "User" row created before `as_of`; readers add recent_users since then
+USER_TOTALS_DDL = """
+    CREATE TABLE IF NOT EXISTS user_totals (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        total_users BIGINT NOT NULL,
+        as_of TIMESTAMPTZ NOT NULL
+    )
+"""
+
+# Every main-DB "User" row created since the user_totals snapshot (and at least the last 24h),
+# refreshed by the intraday cron so Home can count new users without touching the main DB
+RECENT_USERS_DDL = """
+    CREATE TABLE IF NOT EXISTS recent_users (
+        user_id TEXT PRIMARY KEY,
+        username TEXT,
+        created_at TIMESTAMPTZ NOT NULL
+    )
+"""
+
+RECENT_USERS_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_recent_users_created_at ON recent_users (created_at)
+"""
+
+USERS_INDEXES_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_users_created_at ON users (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_users_username ON users (username)",
+)
+
+
+def upsert_user_signups_daily(start: date, conn, end: date = None):
+    """
+    Recounts signups for every day in [start, end] (end defaults to today) and
+    carries the running total forward from the last day before `start`.
+    The first run backfills from the earliest cached user.
+    """
+    end = end or datetime.utcnow().date()
+
+    with conn.cursor() as cur:
+        cur.execute(USER_SIGNUPS_DAILY_DDL)
+        for ddl in USERS_INDEXES_DDL:
+            cur.execute(ddl)
+
+        cur.execute("SELECT 1 FROM user_signups_daily LIMIT 1")
+        if cur.fetchone() is None:
+            cur.execute("SELECT MIN(created_at) FROM users WHERE username IS NOT NULL")
+            first_signup = cur.fetchone()[0]
+            if first_signup and first_signup.date() < start:
+                start = first_signup.date()
+                print(f"🧱 No signup counts yet, backfilling from {start}")
+
+        cur.execute("""
+            SELECT cumulative_users FROM user_signups_daily
+            WHERE date < %s ORDER BY date DESC LIMIT 1
+        """, (start,))
+        row = cur.fetchone()
+        cumulative = row[0] if row else 0
+
+        cur.execute("""
+            SELECT DATE(created_at), COUNT(*)
+            FROM users
+            WHERE username IS NOT NULL AND created_at >= %s AND created_at < %s
+            GROUP BY 1
+        """, (start, end + timedelta(days=1)))
+        counts = dict(cur.fetchall())
+
+        records = []
+        day = start
+        while day <= end:
+            cumulative += counts.get(day, 0)
+            records.append((day, counts.get(day, 0), cumulative))
+            day += timedelta(days=1)
+
+        cur.execute("DELETE FROM user_signups_daily WHERE date >= %s", (start,))
+        if records:
+            execute_values(cur, """
+                INSERT INTO user_signups_daily (date, new_users, cumulative_users)
+                VALUES %s
+            """, records)
+
+    conn.commit()
+    print(f"✅ Upserted {len(records)} rows into user_signups_daily ({cumulative} users total).")
+
+
+def upsert_user_totals(main_conn, conn, as_of: datetime):
+    """
+    Snapshots COUNT(*) of the main DB's "User" table (every user, with or
+    without a username) as of `as_of`.
+    """
+    with main_conn.cursor() as main_cur:
+        main_cur.execute('SELECT COUNT(*) FROM "User" WHERE "createdAt" < %s', (as_of,))
+        total = main_cur.fetchone()[0]
+
+    with conn.cursor() as cur:
+        cur.execute(USER_TOTALS_DDL)
+        cur.execute("""
+            INSERT INTO user_totals (id, total_users, as_of)
+            VALUES (TRUE, %s, %s)
+            ON CONFLICT (id) DO UPDATE SET
+                total_users = EXCLUDED.total_users,
+                as_of = EXCLUDED.as_of
+        """, (total, as_of))
+
+    conn.commit()
+    print(f"✅ Snapshotted {total} total users as of {as_of.isoformat()}")
+
+
+def upsert_recent_users(main_conn, conn, now: datetime):
+    """
+    Mirrors users created since the earlier of the user_totals snapshot and
+    now - 24h into recent_users, and drops older ones.
+    """
+    since = now - timedelta(hours=24)
+    with conn.cursor() as cur:
+        cur.execute(USER_TOTALS_DDL)
+        cur.execute("SELECT as_of FROM user_totals WHERE id")
+        row = cur.fetchone()
+        if row:
+            since = min(since, row[0])
+
+    with main_conn.cursor() as main_cur:
+        main_cur.execute("""
+            SELECT "userId", username, "createdAt" FROM "User"
+            WHERE "createdAt" >= %s
+        """, (since,))
+        users = main_cur.fetchall()
+
+    with conn.cursor() as cur:
+        cur.execute(RECENT_USERS_DDL)
+        cur.execute(RECENT_USERS_INDEX_DDL)
+        cur.execute("DELETE FROM recent_users WHERE created_at < %s", (since,))
+        if users:
+            execute_values(cur, """
+                INSERT INTO recent_users (user_id, username, created_at)
+                VALUES %s
+                ON CONFLICT (user_id) DO UPDATE SET
+                    username = EXCLUDED.username,
+                    created_at = EXCLUDED.created_at
+            """, users)
+
+    conn.commit()
+    print(f"✅ Mirrored {len(users)} user(s) created since {since.isoformat()} into recent_users.")
@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
+
+from helpers.utils import hll
+from helpers.utils.user_keys import normalize_username
+
+# One HyperLogLog sketch of active users per (day, chain, type); merge any subset for distinct counts
+DAILY_USER_SKETCHES_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_user_sketches (
+        date DATE NOT NULL,
+        chain TEXT NOT NULL,
+        type TEXT NOT NULL,
+        sketch BYTEA NOT NULL,
+        PRIMARY KEY (date, chain, type)
+    )
+"""
+
+
+def upsert_daily_user_sketches(start: datetime, conn, end: datetime = None):
+    """
+    Rebuilds the per-(day, chain, type) user sketches for the range.
+    The first run backfills from the earliest cached transaction.
+    """
+    start_date = start.date()
+    end_date = (end or datetime.utcnow()).date() + timedelta(days=1)
+
+    with conn.cursor() as cur:
+        cur.execute(DAILY_USER_SKETCHES_DDL)
+        cur.execute("SELECT 1 FROM daily_user_sketches LIMIT 1")
+        if cur.fetchone() is None:
+            cur.execute("SELECT MIN(created_at) FROM transactions_cache WHERE status = 'SUCCESS'")
+            first_txn = cur.fetchone()[0]
+            if first_txn and first_txn.date() < start_date:
+                start_date = first_txn.date()
+                print(f"🧱 No user sketches yet, backfilling from {start_date}")
+
+        cur.execute("""
+            SELECT DATE(created_at), COALESCE(from_chain, 'unknown'), type, from_user
+            FROM transactions_cache
+            WHERE status = 'SUCCESS' AND from_user IS NOT NULL
+              AND created_at >= %s AND created_at < %s
+            GROUP BY 1, 2, 3, 4
+        """, (start_date, end_date))
+        rows = cur.fetchall()
+
+    users = defaultdict(set)
+    for day, chain, typ, from_user in rows:
+        users[(day, chain, typ)].add(normalize_username(from_user))
+
+    records = [
+        (day, chain, typ, hll.encode(hll.from_values(names)))
+        for (day, chain, typ), names in users.items()
+    ]
+
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM daily_user_sketches WHERE date >= %s AND date < %s", (start_date, end_date))
+        if records:
+            execute_values(cur, """
+                INSERT INTO daily_user_sketches (date, chain, type, sketch)
+                VALUES %s
+            """, records)
+    conn.commit()
+
+    print(f"✅ Upserted {len(records)} rows into daily_user_sketches ({start_date} → {end_date}).")
+
+
+def add_to_daily_user_sketches(conn, users_by_bucket: dict):
+    """
+    Adds users to existing sketches: {(date, chain, type): usernames}.
+    Sketches can't forget a user, so removals wait for the next rebuild.
+    The caller is responsible for committing.
+    """
+    if not users_by_bucket:
+        return
+
+    with conn.cursor() as cur:
+        cur.execute(DAILY_USER_SKETCHES_DDL)
+        cur.execute("""
+            SELECT date, chain, type, sketch FROM daily_user_sketches
+            WHERE (date, chain, type) IN %s
+            FOR UPDATE
+        """, (tuple(users_by_bucket),))
+        stored = {(d, c, t): hll.decode(blob) for d, c, t, blob in cur.fetchall()}
+
+        execute_values(cur, """
+            INSERT INTO daily_user_sketches (date, chain, type, sketch)
+            VALUES %s
+            ON CONFLICT (date, chain, type) DO UPDATE SET sketch = EXCLUDED.sketch
+        """, [
+            (*bucket, hll.encode(hll.merge(
+                stored.get(bucket, hll.empty()),
+                hll.from_values(normalize_username(u) for u in names)
+            )))
+            for bucket, names in users_by_bucket.items()
+        ])
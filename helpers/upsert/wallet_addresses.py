@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from psycopg2.extras import execute_values
+
+# Wallet address -> user mapping copied from the main DB, for wallet search and attribution
+# address_lower is the lookup key; address keeps the original casing (base58 chains are case-sensitive)
+WALLET_ADDRESSES_DDL = """
+    CREATE TABLE IF NOT EXISTS wallet_addresses (
+        address_lower TEXT PRIMARY KEY,
+        address TEXT NOT NULL,
+        chain_type TEXT,
+        user_id TEXT NOT NULL,
+        username TEXT,
+        synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# Before wallet_addresses was keyed on address_lower it was keyed on address. It is a full
+# mirror rewritten by every sync, so an old-layout table is dropped and rebuilt in the same pass.
+WALLET_ADDRESSES_LEGACY_CHECK = """
+    SELECT to_regclass('wallet_addresses') IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'wallet_addresses' AND column_name = 'address_lower'
+    )
+"""
+
+WALLET_ADDRESSES_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_wallet_addresses_user_id ON wallet_addresses (user_id)
+"""
+
+# Lower-cased email -> user, so transaction search can resolve emails without the main DB
+USER_EMAILS_DDL = """
+    CREATE TABLE IF NOT EXISTS user_emails (
+        email TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        username TEXT,
+        synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+def upsert_wallet_addresses(main_conn, cache_conn):
+    """
+    Refreshes wallet_addresses and user_emails from the main DB.
+    Rows not seen in this pass (wallets or users removed upstream) are dropped.
+    """
+    run_started = datetime.now(timezone.utc)
+
+    with main_conn.cursor() as cur:
+        cur.execute("""
+            SELECT DISTINCT ON (LOWER(w.address))
+                   LOWER(w.address), w.address, w."chainType", u."userId", u.username
+            FROM "Wallet" w
+            JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
+            JOIN "User" u ON wa."userId" = u."userId"
+            WHERE w.address IS NOT NULL
+            ORDER BY LOWER(w.address), u."createdAt"
+        """)
+        wallets = cur.fetchall()
+        cur.execute("""
+            SELECT DISTINCT ON (LOWER(email)) LOWER(email), "userId", username
+            FROM "User"
+            WHERE email IS NOT NULL
+            ORDER BY LOWER(email), "createdAt"
+        """)
+        emails = cur.fetchall()
+
+    with cache_conn.cursor() as cur:
+        cur.execute(WALLET_ADDRESSES_LEGACY_CHECK)
+        if cur.fetchone()[0]:
+            print("🧱 Rebuilding wallet_addresses keyed on address_lower")
+            cur.execute("DROP TABLE wallet_addresses")
+        cur.execute(WALLET_ADDRESSES_DDL)
+        cur.execute(WALLET_ADDRESSES_INDEX_DDL)
+        cur.execute(USER_EMAILS_DDL)
+        if wallets:
+            execute_values(cur, """
+                INSERT INTO wallet_addresses (address_lower, address, chain_type, user_id, username, synced_at)
+                VALUES %s
+                ON CONFLICT (address_lower) DO UPDATE SET
+                    address = EXCLUDED.address,
+                    chain_type = EXCLUDED.chain_type,
+                    user_id = EXCLUDED.user_id,
+                    username = EXCLUDED.username,
+                    synced_at = EXCLUDED.synced_at
+            """, [(*row, run_started) for row in wallets])
+        if emails:
+            execute_values(cur, """
+                INSERT INTO user_emails (email, user_id, username, synced_at)
+                VALUES %s
+                ON CONFLICT (email) DO UPDATE SET
+                    user_id = EXCLUDED.user_id,
+                    username = EXCLUDED.username,
+                    synced_at = EXCLUDED.synced_at
+            """, [(*row, run_started) for row in emails])
+        cur.execute("DELETE FROM wallet_addresses WHERE synced_at < %s", (run_started,))
+        cur.execute("DELETE FROM user_emails WHERE synced_at < %s", (run_started,))
+    cache_conn.commit()
+
+    print(f"✅ Synced {len(wallets)} wallet address(es) and {len(emails)} email(s).")
@@ -1,9 +1,9 @@
 
 # helpers/upsert/weekly_stats.py
+from datetime import datetime
 from psycopg2.extras import execute_values
 import pandas as pd
 from helpers.fetch.financials import fetch_avg_revenue_metrics_for_range
-from helpers.fetch.weekly_data import fetch_weekly_swap_revenue
 from helpers.connection import get_cache_db_connection
 
 def upsert_weekly_api_metrics(df):
@@ -43,50 +43,41 @@ def upsert_weekly_stats(df: pd.DataFrame, conn):
             """, (row["week_start_date"], row["metric"], row.get("value", 0), row.get("quantity", 0)))
         conn.commit()
 
-def upsert_weekly_swap_revenue(conn):
-    # === Fetch swap_revenue ===
-    df_revenue = fetch_weekly_swap_revenue(conn)
-
-    # === Fetch swap_volume and swap_transactions from daily_stats ===
-    query = """
-        SELECT DATE_TRUNC('week', date) AS week_start_date,
-               SUM(swap_volume) AS value,
-               SUM(swap_transactions) AS quantity
-        FROM daily_stats
-        GROUP BY week_start_date
-        ORDER BY week_start_date
+def upsert_weekly_swap_revenue(conn, since: datetime):
+    """
+    Recomputes swap_volume / swap_revenue in weekly_stats for just the weeks containing a
+    daily_stats row updated after `since`, in one statement. Untouched weeks are never re-read.
     """
     with conn.cursor() as cur:
-        cur.execute(query)
-        volume_rows = cur.fetchall()
-
-    df_volume = pd.DataFrame([{
-        "week_start_date": row[0],
-        "metric": "swap_volume",
-        "value": float(row[1] or 0),
-        "quantity": int(row[2] or 0),
-    } for row in volume_rows])
-
-    # === Combine both revenue and volume ===
-    combined = pd.concat([df_revenue, df_volume], ignore_index=True)
-
-    if combined.empty:
-        print("⚠️ No weekly swap revenue or volume to upsert.")
-        return
-
-    with conn.cursor() as cur:
-        execute_values(cur, """
+        cur.execute("""
+            WITH changed_weeks AS (
+                SELECT DISTINCT cal.week_start AS week_start_date
+                FROM daily_stats d
+                JOIN calendar cal ON cal.date = d.date
+                WHERE d.updated_at > %s
+            ),
+            weekly AS (
+                SELECT c.week_start_date,
+                       SUM(d.swap_volume) AS swap_volume,
+                       SUM(d.swap_transactions) AS swap_transactions,
+                       SUM(d.swap_revenue) AS swap_revenue
+                FROM changed_weeks c
+                JOIN calendar cal ON cal.week_start = c.week_start_date
+                JOIN daily_stats d ON d.date = cal.date
+                GROUP BY c.week_start_date
+            )
             INSERT INTO weekly_stats (week_start_date, metric, value, quantity)
-            VALUES %s
+            SELECT week_start_date, 'swap_volume', COALESCE(swap_volume, 0), COALESCE(swap_transactions, 0) FROM weekly
+            UNION ALL
+            SELECT week_start_date, 'swap_revenue', COALESCE(swap_revenue, 0), 0 FROM weekly
             ON CONFLICT (week_start_date, metric)
             DO UPDATE SET value = EXCLUDED.value, quantity = EXCLUDED.quantity
-        """, [
-            (r["week_start_date"], r["metric"], r["value"], r["quantity"])
-            for _, r in combined.iterrows()
-        ])
-        conn.commit()
+        """, (since,))
+        upserted = cur.rowcount
+    conn.commit()
+
+    print(f"✅ Upserted {upserted} rows into weekly_stats (swap revenue + volume) for weeks changed since {since.isoformat()}.")
 
-    print(f"✅ Upserted {len(combined)} rows into weekly_stats (swap revenue + volume).")
 def upsert_weekly_avg_revenue(conn):
     weekly_df = fetch_avg_revenue_metrics_for_range(weekly=True)  # adjust this to compute per week
     if weekly_df.empty:
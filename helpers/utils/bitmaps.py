@@ -0,0 +1,59 @@
+import zlib
+from functools import reduce
+
+import numpy as np
+
+
+def from_keys(keys, size: int = 0) -> np.ndarray:
+    """
+    Builds a boolean bitmap with a bit set for every integer user key.
+    """
+    keys = np.fromiter((int(k) for k in keys), dtype=np.int64)
+    length = max(size, int(keys.max()) + 1 if keys.size else 0)
+    bits = np.zeros(length, dtype=bool)
+    bits[keys] = True
+    return bits
+
+
+def to_keys(bits: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(bits)
+
+
+def encode(bits: np.ndarray) -> bytes:
+    """
+    Packs a bitmap 8 bits per byte and zlib-compresses it for BYTEA storage.
+    """
+    return zlib.compress(np.packbits(bits).tobytes())
+
+
+def decode(blob) -> np.ndarray:
+    if blob is None:
+        return np.zeros(0, dtype=bool)
+    packed = np.frombuffer(zlib.decompress(bytes(blob)), dtype=np.uint8)
+    return np.unpackbits(packed).astype(bool)
+
+
+def _align(a: np.ndarray, b: np.ndarray):
+    # Bitmaps grow as new users are interned, so older ones may be shorter
+    if len(a) < len(b):
+        a = np.pad(a, (0, len(b) - len(a)))
+    elif len(b) < len(a):
+        b = np.pad(b, (0, len(a) - len(b)))
+    return a, b
+
+
+def union(*bitmaps: np.ndarray) -> np.ndarray:
+    return reduce(lambda a, b: np.logical_or(*_align(a, b)), bitmaps, np.zeros(0, dtype=bool))
+
+
+def intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.logical_and(*_align(a, b))
+
+
+def difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a, b = _align(a, b)
+    return np.logical_and(a, ~b)
+
+
+def cardinality(bits: np.ndarray) -> int:
+    return int(np.count_nonzero(bits))
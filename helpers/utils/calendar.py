@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Days covered by the in-process lookup; matches the range seeded into the calendar table
+CALENDAR_START = date(2020, 1, 1)
+CALENDAR_END = date(2040, 1, 1)
+
+
+@lru_cache(maxsize=1)
+def _lookup():
+    """
+    week_start / month_start for every day in [CALENDAR_START, CALENDAR_END), indexed by day offset.
+    Weeks start on Monday, same as DATE_TRUNC('week', ...) and the calendar table.
+    """
+    days = np.arange(np.datetime64(CALENDAR_START), np.datetime64(CALENDAR_END), dtype="datetime64[D]")
+    # 1970-01-01 was a Thursday, so (days since epoch + 3) % 7 is the offset from Monday
+    week_starts = days - (days.astype(np.int64) + 3) % 7
+    month_starts = days.astype("datetime64[M]").astype("datetime64[D]")
+    return week_starts, month_starts
+
+
+def _offsets(values) -> np.ndarray:
+    days = pd.to_datetime(pd.Series(values)).values.astype("datetime64[D]")
+    offsets = (days - np.datetime64(CALENDAR_START)).astype(np.int64)
+    if offsets.size and (offsets.min() < 0 or offsets.max() >= len(_lookup()[0])):
+        raise ValueError(f"Dates outside the calendar range {CALENDAR_START} – {CALENDAR_END}")
+    return offsets
+
+
+def week_starts(values) -> pd.Series:
+    """
+    Monday of the week containing each date in `values`, as datetime64.
+    """
+    return pd.Series(pd.to_datetime(_lookup()[0][_offsets(values)]), index=getattr(values, "index", None))
+
+
+def month_starts(values) -> pd.Series:
+    """
+    First day of the month containing each date in `values`, as datetime64.
+    """
+    return pd.Series(pd.to_datetime(_lookup()[1][_offsets(values)]), index=getattr(values, "index", None))
+
+
+def week_start(day: date) -> date:
+    """
+    Monday of the week containing `day`. Plain date arithmetic, so it is cheap inside
+    per-row loops and works outside the lookup range; use week_starts for collections.
+    """
+    return day - timedelta(days=day.weekday())
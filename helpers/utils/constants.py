@@ -22,4 +22,9 @@ CHAIN_ID_MAP = {
     2741: "unknown",
     416312: "ripple",
     416313: "aptos"
-}
\ No newline at end of file
+}
+# Chains offered as leaderboard filters (and precomputed in leaderboard_snapshots)
+LEADERBOARD_CHAINS = [
+    "base", "arbitrum", "ethereum", "polygon", "avalanche",
+    "mode", "bnb", "sui", "solana", "optimism"
+]
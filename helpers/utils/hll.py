@@ -0,0 +1,65 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+# 2^12 one-byte registers: ~4 KB per sketch, ~1.6% relative standard error
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+RELATIVE_ERROR = 1.04 / np.sqrt(REGISTERS)
+
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+_SUFFIX_BITS = 64 - PRECISION
+
+
+def empty() -> np.ndarray:
+    return np.zeros(REGISTERS, dtype=np.uint8)
+
+
+def _hash(value) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+def from_values(values) -> np.ndarray:
+    """
+    Builds a sketch from any iterable of hashable values (e.g. normalized usernames).
+    """
+    registers = empty()
+    for value in values:
+        h = _hash(value)
+        index = h >> _SUFFIX_BITS
+        suffix = h & ((1 << _SUFFIX_BITS) - 1)
+        rank = _SUFFIX_BITS - suffix.bit_length() + 1
+        if rank > registers[index]:
+            registers[index] = rank
+    return registers
+
+
+def merge(*sketches: np.ndarray) -> np.ndarray:
+    return np.maximum.reduce([empty(), *sketches])
+
+
+def estimate(registers: np.ndarray) -> float:
+    raw = _ALPHA * REGISTERS ** 2 / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * REGISTERS and zeros:
+        # Small-range correction (linear counting)
+        return REGISTERS * np.log(REGISTERS / zeros)
+    return float(raw)
+
+
+def standard_error(count: float) -> float:
+    """
+    One standard deviation of an estimate of `count`, in users.
+    """
+    return float(count * RELATIVE_ERROR)
+
+
+def encode(registers: np.ndarray) -> bytes:
+    return zlib.compress(registers.tobytes())
+
+
+def decode(blob) -> np.ndarray:
+    if blob is None:
+        return empty()
+    return np.frombuffer(zlib.decompress(bytes(blob)), dtype=np.uint8).copy()
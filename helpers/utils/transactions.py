@@ -1,6 +1,7 @@
 import json
 import hashlib
 from decimal import Decimal
+from helpers.fetch.wallet_addresses import lookup_wallet_owner
 from helpers.utils.constants import CHAIN_ID_MAP
 
 # === General Helpers ===
@@ -39,19 +40,27 @@ def resolve_username_by_userid(user_id, conn):
     except Exception:
         return user_id
 
-def resolve_username_by_address(address, conn):
+def resolve_username_by_address(address, conn, cache_conn=None):
+    """
+    Username owning a wallet address, or the address itself if unknown.
+    `conn` is a main DB connection. With `cache_conn`, the wallet_addresses mirror
+    (and its LRU) is tried first and the main DB only on a miss.
+    """
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT u.username
-                FROM "Wallet" w
-                JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
-                JOIN "User" u ON wa."userId" = u."userId"
-                WHERE LOWER(w.address) = LOWER(%s)
-                LIMIT 1
-            """, (address,))
-            row = cur.fetchone()
-            return row[0] if row and row[0] else address
+        if cache_conn is not None:
+            owner = lookup_wallet_owner(cache_conn, address, main_conn=conn)
+        else:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT u."userId", u.username
+                    FROM "Wallet" w
+                    JOIN "WalletAccount" wa ON w."walletAccountId" = wa."id"
+                    JOIN "User" u ON wa."userId" = u."userId"
+                    WHERE LOWER(w.address) = LOWER(%s)
+                    LIMIT 1
+                """, (address,))
+                owner = cur.fetchone()
+        return owner[1] if owner and owner[1] else address
     except Exception:
         return address
 
@@ -0,0 +1,67 @@
+USER_KEYS_DDL = """
+    CREATE TABLE IF NOT EXISTS user_keys (
+        user_key INTEGER PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE
+    )
+"""
+
+# In-process cache of username -> dense integer key (keys are never reassigned)
+_key_cache: dict = {}
+
+
+def normalize_username(username) -> str:
+    return str(username).strip().lower()
+
+
+def lookup_user_keys(conn, usernames) -> dict:
+    """
+    Returns {normalized_username: user_key} for usernames that already have a key.
+    Read-only: usernames without a key (or every name, before any key has been
+    interned) are left out.
+    """
+    names = {normalize_username(u) for u in usernames if u}
+    missing = list(names - _key_cache.keys())
+
+    if missing:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('user_keys')")
+            if cur.fetchone()[0] is None:
+                return {name: _key_cache[name] for name in names if name in _key_cache}
+            cur.execute(
+                "SELECT username, user_key FROM user_keys WHERE username = ANY(%s)",
+                (missing,)
+            )
+            _key_cache.update(cur.fetchall())
+
+    return {name: _key_cache[name] for name in names if name in _key_cache}
+
+
+def intern_usernames(conn, usernames) -> dict:
+    """
+    Assigns dense integer keys to any usernames that don't have one yet and
+    returns {normalized_username: user_key} for all of them.
+    The caller is responsible for committing.
+    """
+    keys = lookup_user_keys(conn, usernames)
+    names = {normalize_username(u) for u in usernames if u}
+    new_names = sorted(names - keys.keys())
+
+    if new_names:
+        with conn.cursor() as cur:
+            cur.execute(USER_KEYS_DDL)
+            # Serialize key assignment so concurrent writers can't hand out the same key
+            cur.execute("LOCK TABLE user_keys IN SHARE ROW EXCLUSIVE MODE")
+            cur.execute("""
+                INSERT INTO user_keys (user_key, username)
+                SELECT (SELECT COALESCE(MAX(user_key), -1) FROM user_keys) + t.ord, t.username
+                FROM unnest(%s::text[]) WITH ORDINALITY AS t(username, ord)
+                ON CONFLICT (username) DO NOTHING
+            """, (new_names,))
+            cur.execute(
+                "SELECT username, user_key FROM user_keys WHERE username = ANY(%s)",
+                (new_names,)
+            )
+            # Not cached until committed: a rollback would free these keys again
+            keys.update(cur.fetchall())
+
+    return keys
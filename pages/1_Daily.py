@@ -21,14 +21,9 @@ default_start = today - timedelta(days=60)
 start_date, end_date = st.date_input("Date range:", (default_start, today))
 
 # === LOAD BASE DAILY STATS ===
-df_apps = fetch_daily_app_downloads()
+df_apps = fetch_daily_app_downloads(start=start_date, end=end_date)
 df_apps["date"] = pd.to_datetime(df_apps["date"])  # 🔧 Ensure datetime64 format
 
-start_ts = pd.Timestamp(start_date)
-end_ts = pd.Timestamp(end_date)
-
-df_apps = df_apps[(df_apps["date"] >= start_ts) & (df_apps["date"] <= end_ts)]
-
 df = fetch_daily_stats(start=start_date, end=end_date)
 if df.empty:
     st.warning("No daily stats available for selected range.")
@@ -96,10 +91,9 @@ with col10:
 
 st.subheader("💰 Total Balance Over Time")
 
-balance_df = pd.DataFrame(fetch_total_balances())
-balance_df["date"] = pd.to_datetime(balance_df["date"])
-balance_df["total_balance_usd"] = pd.to_numeric(balance_df["total_balance_usd"], errors="coerce")
-filtered_df = balance_df[(balance_df["date"] >= pd.Timestamp(start_date)) & (balance_df["date"] <= pd.Timestamp(end_date))]
+filtered_df = pd.DataFrame(fetch_total_balances(start=start_date, end=end_date), columns=["date", "total_balance_usd"])
+filtered_df["date"] = pd.to_datetime(filtered_df["date"])
+filtered_df["total_balance_usd"] = pd.to_numeric(filtered_df["total_balance_usd"], errors="coerce")
 
 col_left, _ = st.columns(2)
 with col_left:
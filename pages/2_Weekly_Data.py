@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from helpers.connection import get_cache_db_connection
+from helpers.fetch.weekly_data import fetch_first_week, fetch_weekly_stats
+from helpers.utils.calendar import week_start
 from helpers.utils.charts import metric_section
 
 st.set_page_config(page_title="Weekly Data", layout="wide")
@@ -34,32 +35,29 @@ VALUE_SUFFIX = {
     "new_active_users": "Users"
 }
 
-# === Load weekly_stats table ===
-with get_cache_db_connection() as conn:
-    df = pd.read_sql("SELECT * FROM weekly_stats", conn)
+# === Filter controls ===
+exclude_current_week = st.toggle("🚫 Exclude current (incomplete) week", value=True)
 
-if df.empty:
+first_week = fetch_first_week(AVAILABLE_METRICS)
+if first_week is None:
     st.warning("No data found in `weekly_stats`.")
     st.stop()
 
-df["week_start_date"] = pd.to_datetime(df["week_start_date"])
-df = df[df["metric"].isin(AVAILABLE_METRICS)]
-
-# === Filter controls ===
-exclude_current_week = st.toggle("🚫 Exclude current (incomplete) week", value=True)
-
-min_week = df["week_start_date"].min().date()
+min_week = first_week
 max_week = datetime.now().date()
 default_start = max(min_week, datetime(2025, 1, 1).date())
 
 date_range = st.date_input("📅 Select date range:", (default_start, max_week), min_value=min_week, max_value=max_week)
-start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+start_date, end_date = date_range[0], date_range[1]
 
 if exclude_current_week:
-    current_week = pd.Timestamp(datetime.now(timezone.utc).date()).to_period("W").start_time
-    df = df[df["week_start_date"] < current_week]
+    current_week = week_start(datetime.now(timezone.utc).date())
+    end_date = min(end_date, current_week - timedelta(days=1))
 
-df = df[(df["week_start_date"] >= start_date) & (df["week_start_date"] <= end_date)]
+# === Load just the selected weeks and metrics ===
+df = fetch_weekly_stats(AVAILABLE_METRICS, start=start_date, end=end_date)
+df = df.rename(columns={"week": "week_start_date"})
+df["week_start_date"] = pd.to_datetime(df["week_start_date"])
 
 # === Show charts ===
 chart_metrics = [
@@ -5,13 +5,18 @@ from datetime import datetime, timedelta, timezone
 from st_aggrid import GridOptionsBuilder, AgGrid, GridUpdateMode
 import pandas as pd
 
-from helpers.fetch.transactions import fetch_transactions_filtered
-from helpers.fetch.user_profile import fetch_user_profile_summary, fetch_user_metrics_full
-from helpers.connection import get_main_db_connection, get_cache_db_connection
+from helpers.fetch.transactions import (
+    fetch_transaction_summary,
+    fetch_transactions_page,
+)
+from helpers.fetch.user_profile import fetch_user_stats
+from helpers.connection import get_cache_db_connection
 from helpers.utils.sync_state import get_last_sync, update_last_sync
 from helpers.upsert.transactions import upsert_transactions_from_activity
 
 SECTION_KEY = "Transactions"
+PAGE_SIZES = [100, 250, 500, 1000]
+DEFAULT_PAGE_SIZE = 250
 
 st.set_page_config(page_title="🔁 Transactions", layout="wide")
 st.title("🔁 Transactions")
@@ -39,19 +44,19 @@ with stats_col2:
 
 # === Load User Stats ===
 if st.button("📊 Load User Stats"):
-    with get_main_db_connection() as conn:
-        profile = fetch_user_profile_summary(conn, user_input)
+    with st.spinner("Loading user stats..."):
+        profile, metrics = fetch_user_stats(
+            user_input,
+            start=start_date.isoformat(),
+            end=(datetime.today() + timedelta(days=1)).date().isoformat()
+        )
 
     if profile:
-        resolved_identifier = profile.get("username") or profile.get("email")
-        if not resolved_identifier:
+        if not (profile.get("username") or profile.get("email")):
             st.warning("⚠️ User found, but no valid username or email to query.")
+        elif metrics is None:
+            st.warning("⚠️ User found, but their metrics could not be loaded. Try again shortly.")
         else:
-            metrics = fetch_user_metrics_full(
-                resolved_identifier,
-                start=start_date.isoformat(),
-                end=(datetime.today() + timedelta(days=1)).date().isoformat()
-            )
             st.session_state.user_profile = profile
             st.session_state.user_stats = metrics
     else:
@@ -130,16 +135,45 @@ if st.button("🪯 Apply Table Filter"):
     st.session_state.search_filter = search_input
     st.rerun()
 
-# === Fetch Filtered Transactions ===
-txn_data = fetch_transactions_filtered(
-    search_user_or_email=st.session_state.search_filter or None,
-    since_date=start_date.isoformat(),
-    from_chain=None,
-    to_chain=None,
-    limit=1000,
+# === Fetch One Page of Filtered Transactions ===
+txn_filters = {
+    "search_user_or_email": st.session_state.search_filter or None,
+    "since_date": start_date.isoformat(),
+}
+
+page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+
+# Cursors for the start of each visited page; reset whenever the filters or page size change
+filter_key = (tuple(sorted(txn_filters.items())), page_size)
+if st.session_state.get("txn_filter_key") != filter_key:
+    st.session_state.txn_filter_key = filter_key
+    st.session_state.txn_cursors = [None]
+df, next_cursor = fetch_transactions_page(
+    page_size=page_size,
+    after=st.session_state.txn_cursors[-1],
+    **txn_filters,
 )
+page_number = len(st.session_state.txn_cursors)
 
-df = pd.DataFrame(txn_data)
+# Summary over every matching transaction (not just this page); also gives the exact pager total
+summary = fetch_transaction_summary(**txn_filters)
+total_count = int(summary["tx_count"].sum()) if not summary.empty else 0
+
+nav_prev, nav_info, nav_next = st.columns([1, 3, 1])
+with nav_prev:
+    if st.button("⬅️ Newer", disabled=page_number == 1):
+        st.session_state.txn_cursors.pop()
+        st.rerun()
+with nav_info:
+    st.markdown(
+        f"<div style='text-align: center; color: gray;'>Page {page_number} · "
+        f"{total_count:,} matching transactions</div>",
+        unsafe_allow_html=True
+    )
+with nav_next:
+    if st.button("Older ➡️", disabled=next_cursor is None):
+        st.session_state.txn_cursors.append(next_cursor)
+        st.rerun()
 
 # Drop duplicated column names
 df = df.loc[:, ~df.columns.duplicated()]
@@ -195,7 +229,24 @@ AgGrid(
     allow_unsafe_jscode=True
 )
 
-# === Total Amount USD Summary ===
-if not df.empty and "Amount USD" in df.columns:
-    total_usd = df["Amount USD"].sum()
+# === Summary over every matching transaction (not just this page) ===
+if not summary.empty:
+    total_usd = summary["volume_usd"].sum()
     st.markdown(f"### 💸 Total Amount USD: **${total_usd:,.2f}**")
+
+    sum_col1, sum_col2, sum_col3 = st.columns(3)
+    sum_col1.metric("Transactions", f"{total_count:,}")
+    sum_col2.metric("Volume (USD)", f"${total_usd:,.2f}")
+    sum_col3.metric("Fees (USD)", f"${summary['fee_usd'].sum():,.2f}")
+
+    st.dataframe(
+        summary.rename(columns={
+            "type": "Type",
+            "status": "Status",
+            "tx_count": "Transactions",
+            "volume_usd": "Volume USD",
+            "fee_usd": "Fees USD",
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
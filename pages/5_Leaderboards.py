@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta, time
 from helpers.connection import get_cache_db_connection
-from helpers.fetch.user import fetch_top_users_by_metric
+from helpers.fetch.user import fetch_leaderboard_snapshot, fetch_top_users_by_metric
+from helpers.utils.constants import LEADERBOARD_CHAINS
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 
 # === SETUP ===
@@ -29,10 +30,15 @@ if "custom_date_range" not in st.session_state:
 if "top_n" not in st.session_state:
     st.session_state.top_n = 10
 
-CHAIN_OPTIONS = [
-    "base", "arbitrum", "ethereum", "polygon", "avalanche",
-    "mode", "bnb", "sui", "solana", "optimism"
-]
+CHAIN_OPTIONS = LEADERBOARD_CHAINS
+
+# Preset ranges served from cron-computed leaderboard_snapshots
+SNAPSHOT_WINDOWS = {
+    "Last 24 Hours": "24h",
+    "Last 7 Days": "7d",
+    "Last 30 Days": "30d",
+    "Lifetime": "lifetime",
+}
 
 # === LAYOUT ===
 col_left, col_right = st.columns([1.2, 1.2])
@@ -106,14 +112,25 @@ with col_right:
         conn = get_cache_db_connection()
         metric_key = LEADERBOARD_TYPES[st.session_state.selected_leaderboard]
 
-        results = fetch_top_users_by_metric(
-            conn,
-            metric=metric_key,
-            start_date=start_date,
-            end_date=end_date,
-            chains=selected_chains if selected_chains else None,
-            limit=st.session_state.top_n
-        )
+        results = watermark = None
+        if date_selection in SNAPSHOT_WINDOWS and len(selected_chains) <= 1:
+            results, watermark = fetch_leaderboard_snapshot(
+                conn,
+                SNAPSHOT_WINDOWS[date_selection],
+                metric=metric_key,
+                chain=selected_chains[0] if selected_chains else None,
+                limit=st.session_state.top_n
+            )
+
+        if results is None:
+            results = fetch_top_users_by_metric(
+                conn,
+                metric=metric_key,
+                start_date=start_date,
+                end_date=end_date,
+                chains=selected_chains if selected_chains else None,
+                limit=st.session_state.top_n
+            )
 
         if metric_key in ["swap", "cash"]:
             value_col = "Swap Volume ($)" if metric_key == "swap" else "Cash Volume ($)"
@@ -134,6 +151,9 @@ with col_right:
         else:
             df = pd.DataFrame()
 
+    if watermark is not None:
+        st.caption(f"Precomputed snapshot · transactions as of {watermark:%Y-%m-%d %H:%M} UTC")
+
     if df.empty:
         st.warning("No leaderboard data available for the selected filters.")
     else:
@@ -0,0 +1,82 @@
+import streamlit as st
+import pandas as pd
+import altair as alt
+from datetime import datetime, timedelta, timezone
+
+from helpers.fetch.user_cohorts import fetch_rolling_active_users, fetch_cohort_retention
+
+# === CONFIG ===
+st.set_page_config(page_title="User Retention", layout="wide")
+st.title("🔁 User Retention")
+
+# === DATE RANGE ===
+today = datetime.now(timezone.utc).date()
+default_start = today - timedelta(days=90)
+start_date, end_date = st.date_input("Date range:", (default_start, today))
+
+# === ROLLING ACTIVE USERS ===
+rolling = fetch_rolling_active_users(start=start_date, end=end_date)
+if rolling.empty:
+    st.warning("No rolling active user data available yet.")
+    st.stop()
+
+latest = rolling.iloc[-1]
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("DAU", f"{int(latest['dau']):,}")
+col2.metric("WAU (7d)", f"{int(latest['wau']):,}")
+col3.metric("MAU (30d)", f"{int(latest['mau']):,}")
+col4.metric("Stickiness (DAU/MAU)", f"{latest['stickiness']:.1%}")
+
+st.subheader("👥 Distinct Active Users")
+actives = rolling.melt(id_vars="date", value_vars=["dau", "wau", "mau"], var_name="window", value_name="users")
+actives["window"] = actives["window"].str.upper()
+st.altair_chart(
+    alt.Chart(actives).mark_line().encode(
+        x=alt.X("date:T", title="Date"),
+        y=alt.Y("users:Q", title="Users"),
+        color=alt.Color("window:N", title="Window"),
+        tooltip=["date:T", "window:N", "users:Q"]
+    ).properties(height=400),
+    use_container_width=True
+)
+
+st.subheader("📌 Stickiness")
+st.altair_chart(
+    alt.Chart(rolling).mark_line(point=True).encode(
+        x=alt.X("date:T", title="Date"),
+        y=alt.Y("stickiness:Q", title="DAU / MAU", axis=alt.Axis(format="%")),
+        tooltip=["date:T", alt.Tooltip("stickiness:Q", format=".1%")]
+    ).properties(height=300),
+    use_container_width=True
+)
+
+# === COHORT RETENTION ===
+st.subheader("📅 Weekly Signup Cohort Retention")
+cohorts = fetch_cohort_retention(start=start_date, end=end_date)
+if cohorts.empty:
+    st.info("No cohort data for the selected range.")
+    st.stop()
+
+cohorts["cohort"] = cohorts["cohort_week"].dt.strftime("%Y-%m-%d")
+heatmap = alt.Chart(cohorts).mark_rect().encode(
+    x=alt.X("week_offset:O", title="Weeks Since Signup"),
+    y=alt.Y("cohort:O", title="Signup Week"),
+    color=alt.Color("retention_rate:Q", title="Retention", scale=alt.Scale(scheme="blues")),
+    tooltip=[
+        alt.Tooltip("cohort:N", title="Cohort"),
+        alt.Tooltip("week_offset:O", title="Week"),
+        alt.Tooltip("cohort_size:Q", title="Cohort Size"),
+        alt.Tooltip("retained_users:Q", title="Retained"),
+        alt.Tooltip("retention_rate:Q", title="Retention", format=".1%")
+    ]
+)
+labels = heatmap.mark_text(fontSize=10).encode(
+    text=alt.Text("retention_rate:Q", format=".0%"),
+    color=alt.value("black")
+)
+st.altair_chart((heatmap + labels).properties(height=max(300, 22 * cohorts["cohort"].nunique())), use_container_width=True)
+
+table = cohorts.pivot(index="cohort", columns="week_offset", values="retention_rate")
+sizes = cohorts.groupby("cohort")["cohort_size"].max()
+table.insert(0, "Cohort Size", sizes)
+st.dataframe(table, use_container_width=True)